@@ -0,0 +1,188 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Optional, List, Dict, Tuple
+from ..fetcher.local_fetcher import LocalFetcher
+
+class AnalyticsEngine:
+    """
+    本地跨资产分析引擎。
+    基于已保存的 price_history 一次性计算整个股票池的收益率均值/标准差、
+    协方差/相关系数矩阵和 beta，替代逐只股票调用 Alpha Vantage ANALYTICS_FIXED_WINDOW。
+    结果按 (universe, window) 缓存，底层价格文件变化时自动失效。
+    """
+    def __init__(self, base_dir: str = "data", benchmark: str = "SPY"):
+        self.base_dir = base_dir
+        self.benchmark = benchmark
+        self.local = LocalFetcher(base_dir)
+        self._cache: Dict[Tuple, Tuple[Tuple, dict]] = {}
+        self._lock = threading.Lock()
+
+    def universe(self) -> List[str]:
+        """Symbols with stored price history"""
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.base_dir)
+            if os.path.exists(os.path.join(self.base_dir, name, "price_history.csv"))
+        )
+
+    def _signature(self, symbols: List[str]) -> Tuple:
+        # Corporate actions change the read-time adjustment of stored prices
+        paths = [os.path.join(self.base_dir, s, name) for s in symbols
+                 for name in ("price_history.csv", "corporate_actions.csv")]
+        return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+    def load_closes(self, symbols: List[str], window: Optional[int] = None) -> pd.DataFrame:
+        """Aligned close prices (dates × symbols); `window` keeps the most recent N+1 rows."""
+        closes = {}
+        for symbol in symbols:
+            df = self.local.fetch_price_history(symbol, "1900-01-01", "2100-12-31")
+            if df.empty or "Close" not in df.columns:
+                continue
+            close = pd.to_numeric(df["Close"], errors="coerce")
+            if isinstance(close.index, pd.DatetimeIndex) and close.index.tz is not None:
+                close.index = close.index.tz_localize(None)
+            closes[symbol] = close[~close.index.duplicated(keep="last")]
+        if not closes:
+            return pd.DataFrame()
+        prices = pd.DataFrame(closes).sort_index()
+        if window:
+            prices = prices.iloc[-(window + 1):]
+        return prices
+
+    def compute(self, symbols: Optional[List[str]] = None, window: Optional[int] = None) -> dict:
+        """
+        Return statistics of daily returns for the universe:
+            {"symbols", "min_dt", "max_dt", "mean", "stddev", "beta" (Series),
+             "covariance", "correlation" (DataFrame)}
+        """
+        symbols = sorted(symbols) if symbols else self.universe()
+        key = (tuple(symbols), window)
+        signature = self._signature(symbols)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+        result = self._compute(symbols, window)
+        with self._lock:
+            self._cache[key] = (signature, result)
+        return result
+
+    def _compute(self, symbols: List[str], window: Optional[int]) -> dict:
+        prices = self.load_closes(symbols, window)
+        if prices.empty:
+            return {}
+        returns = prices.pct_change(fill_method=None).iloc[1:]
+        columns = list(returns.columns)
+        r = returns.to_numpy(dtype=float)
+
+        mean = np.nanmean(r, axis=0)
+        stddev = np.nanstd(r, axis=0, ddof=1)
+        cov, corr = self._pairwise_cov_corr(r)
+
+        if self.benchmark in columns:
+            bench = r[:, columns.index(self.benchmark)]
+        else:
+            # Equal-weighted universe return as the market proxy
+            bench = np.nanmean(r, axis=1)
+        beta = self._beta(r, bench)
+
+        return {
+            "symbols": columns,
+            "min_dt": returns.index.min(),
+            "max_dt": returns.index.max(),
+            "mean": pd.Series(mean, index=columns),
+            "stddev": pd.Series(stddev, index=columns),
+            "beta": pd.Series(beta, index=columns),
+            "covariance": pd.DataFrame(cov, index=columns, columns=columns),
+            "correlation": pd.DataFrame(corr, index=columns, columns=columns),
+        }
+
+    @staticmethod
+    def _pairwise_cov_corr(r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Covariance and correlation over pairwise-complete observations,
+        so symbols with shorter histories don't truncate everyone else.
+        """
+        mask = ~np.isnan(r)
+        m = mask.astype(float)
+        x = np.where(mask, r, 0.0)
+
+        n = m.T @ m                 # joint observation counts
+        sum_x = x.T @ m             # sum of x_i where x_j is present
+        sum_y = sum_x.T             # sum of x_j where x_i is present
+        sum_xy = x.T @ x
+        sum_x2 = (x * x).T @ m
+        sum_y2 = sum_x2.T
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (sum_xy - sum_x * sum_y / n) / (n - 1)
+            var_x = (sum_x2 - sum_x ** 2 / n) / (n - 1)
+            var_y = (sum_y2 - sum_y ** 2 / n) / (n - 1)
+            corr = cov / np.sqrt(var_x * var_y)
+        cov[n < 2] = np.nan
+        corr[n < 2] = np.nan
+        return cov, corr
+
+    @staticmethod
+    def _beta(r: np.ndarray, bench: np.ndarray) -> np.ndarray:
+        mask = ~np.isnan(r) & ~np.isnan(bench)[:, None]
+        n = mask.sum(axis=0)
+        x = np.where(mask, r, 0.0)
+        b = np.where(mask, bench[:, None], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x = x.sum(axis=0) / n
+            mean_b = b.sum(axis=0) / n
+            cov = ((x - mean_x) * (b - mean_b) * mask).sum(axis=0) / (n - 1)
+            var_b = (((b - mean_b) ** 2) * mask).sum(axis=0) / (n - 1)
+            return cov / var_b
+
+    def rolling_stats(self, symbols: Optional[List[str]] = None, window: int = 20) -> Dict[str, pd.DataFrame]:
+        """Rolling mean / stddev of daily returns (dates × symbols)."""
+        symbols = sorted(symbols) if symbols else self.universe()
+        prices = self.load_closes(symbols)
+        if prices.empty:
+            return {}
+        returns = prices.pct_change(fill_method=None)
+        rolling = returns.rolling(window, min_periods=window)
+        return {"mean": rolling.mean(), "stddev": rolling.std()}
+
+    def symbol_analytics(self, symbol: str, window: Optional[int] = None) -> dict:
+        """
+        Per-symbol view shaped like the Alpha Vantage ANALYTICS_FIXED_WINDOW response,
+        with correlation/covariance against the rest of the stored universe.
+        """
+        universe = self.universe()
+        if symbol not in universe:
+            return {}
+        stats = self.compute(universe, window)
+        if not stats or symbol not in stats["symbols"]:
+            return {}
+
+        def clean(series: pd.Series) -> dict:
+            return {k: (None if pd.isna(v) else float(v)) for k, v in series.items()}
+
+        return {
+            "meta_data": {
+                "symbols": symbol,
+                "universe": ",".join(stats["symbols"]),
+                "min_dt": stats["min_dt"].strftime("%Y-%m-%d"),
+                "max_dt": stats["max_dt"].strftime("%Y-%m-%d"),
+                "ohlc": "Close",
+                "interval": "DAILY",
+                "window": window or "full",
+                "source": "local",
+            },
+            "payload": {
+                "RETURNS_CALCULATIONS": {
+                    "MEAN": {symbol: clean(stats["mean"])[symbol]},
+                    "STDDEV": {symbol: clean(stats["stddev"])[symbol]},
+                    "BETA": {symbol: clean(stats["beta"])[symbol]},
+                    "CORRELATION": clean(stats["correlation"][symbol]),
+                    "COVARIANCE": clean(stats["covariance"][symbol]),
+                }
+            }
+        }
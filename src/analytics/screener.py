@@ -0,0 +1,99 @@
+import re
+import pandas as pd
+import numpy as np
+from typing import Optional, List
+from ..storage.fundamentals_store import FundamentalsStore
+
+# Canonical metric -> (statement, source field names in priority order: yfinance, Alpha Vantage)
+METRIC_FIELDS = {
+    "total_debt": ("balance_sheet", ["Total Debt", "shortLongTermDebtTotal"]),
+    "total_equity": ("balance_sheet", ["Stockholders Equity", "totalShareholderEquity"]),
+    "total_assets": ("balance_sheet", ["Total Assets", "totalAssets"]),
+    "total_liabilities": ("balance_sheet", ["Total Liabilities Net Minority Interest", "totalLiabilities"]),
+    "cash": ("balance_sheet", ["Cash And Cash Equivalents", "cashAndCashEquivalentsAtCarryingValue"]),
+    "operating_cash_flow": ("cash_flow", ["Operating Cash Flow", "operatingCashflow"]),
+    "capital_expenditure": ("cash_flow", ["Capital Expenditure", "capitalExpenditures"]),
+    "free_cash_flow": ("cash_flow", ["Free Cash Flow"]),
+    "revenue": ("income_statement", ["Total Revenue", "totalRevenue"]),
+    "net_income": ("income_statement", ["Net Income", "netIncome"]),
+    "operating_income": ("income_statement", ["Operating Income", "operatingIncome"]),
+}
+
+class Screener:
+    """
+    跨公司基本面筛选器。
+    一次查询取出整个股票池所需字段，按 symbol 展开为 最新期 / 上一期 两组列，
+    然后用 pandas 表达式做向量化过滤，例如:
+        screener.screen("debt_to_equity < 0.5 and fcf_growth > 10%")
+
+    可用列: METRIC_FIELDS 中的指标 (最新期)、对应的 *_prev (上一期)、*_growth (同比)，
+    以及 debt_to_equity、net_margin、roe、fcf (free_cash_flow 的别名)。
+    同一张报表的指标都取自该报表的最新一期 / 上一期，不会混用不同财期。
+    """
+    def __init__(self, store: Optional[FundamentalsStore] = None):
+        self.store = store or FundamentalsStore()
+
+    def metrics(self, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """One row per symbol with latest/previous values and derived ratios."""
+        alias_rank = {}
+        field_metric = {}
+        for metric, (statement, fields) in METRIC_FIELDS.items():
+            for rank, field in enumerate(fields):
+                field_metric[(statement, field)] = metric
+                alias_rank[(statement, field)] = rank
+
+        long = self.store.query(
+            fields=sorted({f for _, fields in METRIC_FIELDS.values() for f in fields}),
+            symbols=symbols
+        )
+        if long.empty:
+            return pd.DataFrame()
+
+        keys = list(zip(long["statement"], long["field"]))
+        long["metric"] = [field_metric.get(k) for k in keys]
+        long["alias_rank"] = [alias_rank.get(k) for k in keys]
+        long = long.dropna(subset=["metric"])
+
+        # Prefer the first alias when a symbol has the same metric under several field names
+        long = long.sort_values(["symbol", "metric", "period_end", "alias_rank"], ascending=[True, True, False, True])
+        long = long.drop_duplicates(["symbol", "metric", "period_end"])
+        # Rank periods per statement, not per metric, so all metrics (and ratios) of a statement
+        # come from the same filing; a field missing from the latest period stays NaN
+        long["period_rank"] = long.groupby(["symbol", "statement"])["period_end"].rank(
+            method="dense", ascending=False).astype(int) - 1
+
+        latest = long[long["period_rank"] == 0].pivot(index="symbol", columns="metric", values="value")
+        prev = long[long["period_rank"] == 1].pivot(index="symbol", columns="metric", values="value")
+        period_end = long[long["period_rank"] == 0].groupby("symbol")["period_end"].max()
+
+        df = latest.reindex(columns=list(METRIC_FIELDS))
+        prev = prev.reindex(index=df.index, columns=list(METRIC_FIELDS))
+
+        # Alpha Vantage has no free cash flow line; capex sign differs between sources
+        for frame in (df, prev):
+            derived_fcf = frame["operating_cash_flow"] - frame["capital_expenditure"].abs()
+            frame["free_cash_flow"] = frame["free_cash_flow"].fillna(derived_fcf)
+
+        for metric in METRIC_FIELDS:
+            df[f"{metric}_prev"] = prev[metric]
+            df[f"{metric}_growth"] = (df[metric] - prev[metric]) / prev[metric].abs()
+
+        df["fcf"] = df["free_cash_flow"]
+        df["fcf_prev"] = df["free_cash_flow_prev"]
+        df["fcf_growth"] = df["free_cash_flow_growth"]
+        df["debt_to_equity"] = df["total_debt"] / df["total_equity"]
+        df["net_margin"] = df["net_income"] / df["revenue"]
+        df["roe"] = df["net_income"] / df["total_equity"]
+        df["period_end"] = period_end
+
+        df = df.replace([np.inf, -np.inf], np.nan)
+        df.columns.name = None
+        return df
+
+    def screen(self, expression: str, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Symbols whose metrics satisfy `expression`. Percentages like '10%' are accepted."""
+        df = self.metrics(symbols)
+        if df.empty:
+            return df
+        expression = re.sub(r"(\d+(?:\.\d+)?)\s*%", lambda m: str(float(m.group(1)) / 100), expression)
+        return df.query(expression)
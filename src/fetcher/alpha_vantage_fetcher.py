@@ -4,36 +4,80 @@ import pandas as pd
 from typing import Optional
 from .base import BaseFetcher
 from ..utils.decorators import rate_limit
+from ..utils.quota import DailyQuota, QuotaExhaustedError
+from ..utils.tracing import span
 
 class AlphaVantageFetcher(BaseFetcher):
     """
     使用 Alpha Vantage API 获取数据
     """
     BASE_URL = "https://www.alphavantage.co/query"
+    # Free tier daily cap, override with ALPHA_VANTAGE_DAILY_LIMIT
+    DEFAULT_DAILY_LIMIT = 25
+    # Wait used when AV reports a short-term (per-minute/per-second) limit
+    MINUTE_WINDOW = 65.0
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, quota: Optional[DailyQuota] = None):
         self.api_key = api_key or os.getenv("ALPHA_VANTAGE_API_KEY")
         if not self.api_key:
             raise ValueError("Alpha Vantage API key is required. Set ALPHA_VANTAGE_API_KEY env var or pass it to constructor.")
+        self.quota = quota or DailyQuota(
+            os.path.join("data", ".alpha_vantage_quota.json"),
+            daily_limit=int(os.getenv("ALPHA_VANTAGE_DAILY_LIMIT", self.DEFAULT_DAILY_LIMIT))
+        )
+
+    def _make_request(self, params: dict) -> dict:
+        # Check the daily budget before queueing on the per-minute limiter,
+        # so an exhausted quota fails fast instead of sleeping first
+        if not self.quota.available():
+            raise QuotaExhaustedError(
+                "Alpha Vantage daily quota exhausted",
+                retry_after=self.quota.seconds_until_reset()
+            )
+        return self._request(params)
 
     # Limit to 5 calls per minute (standard free tier)
     # Using 65 seconds window to be safe
     @rate_limit(max_calls=5, period=65.0)
-    def _make_request(self, params: dict) -> dict:
+    def _request(self, params: dict) -> dict:
         params["apikey"] = self.api_key
-        response = requests.get(self.BASE_URL, params=params)
+        with span("http", cat="http", function=params.get("function"), symbol=params.get("symbol")):
+            response = requests.get(self.BASE_URL, params=params)
+        self.quota.consume()
         response.raise_for_status()
-        data = response.json()
+        with span("parse_json", cat="parse"):
+            data = response.json()
         if "Error Message" in data:
             raise ValueError(f"Alpha Vantage API Error: {data['Error Message']}")
-        if "Information" in data:
-             # Rate limit or other info
-             print(f"Alpha Vantage Info: {data['Information']}")
+        message = data.get("Information") or data.get("Note")
+        if message:
+            if self._is_daily_limit_message(message):
+                self.quota.mark_exhausted()
+                raise QuotaExhaustedError(
+                    f"Alpha Vantage daily quota exhausted: {message}",
+                    retry_after=self.quota.seconds_until_reset()
+                )
+            if self._is_rate_limit_message(message):
+                raise QuotaExhaustedError(f"Alpha Vantage rate limited: {message}", retry_after=self.MINUTE_WINDOW)
+            # Other informational messages (e.g. premium endpoint notices)
+            print(f"Alpha Vantage Info: {message}")
         return data
 
-    def fetch_price_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    @staticmethod
+    def _is_daily_limit_message(message: str) -> bool:
+        message = message.lower()
+        return "per day" in message or "daily" in message
+
+    @staticmethod
+    def _is_rate_limit_message(message: str) -> bool:
+        message = message.lower()
+        return "rate limit" in message or "per minute" in message or "per second" in message \
+            or "more sparingly" in message
+
+    def fetch_price_history(self, symbol: str, start_date: str, end_date: str, adjusted: bool = True) -> pd.DataFrame:
         # Alpha Vantage TIME_SERIES_DAILY is the closest, but filtering by date requires processing
         # For now, we can implement a basic version or leave it as a secondary source
+        # TIME_SERIES_DAILY is unadjusted and carries no actions (DAILY_ADJUSTED is premium), so `adjusted` is ignored
         params = {
             "function": "TIME_SERIES_DAILY",
             "symbol": symbol,
@@ -90,13 +134,19 @@ class AlphaVantageFetcher(BaseFetcher):
         # maybe EARNINGS_ESTIMATES or similar?
         return pd.DataFrame()
 
-    def fetch_news_sentiment(self, symbol: str) -> pd.DataFrame:
+    def fetch_news_sentiment(self, symbol: str, time_from: Optional[str] = None) -> pd.DataFrame:
         # Alpha Intelligence
         params = {
             "function": "NEWS_SENTIMENT",
             "tickers": symbol,
             "limit": 50
         }
+        if time_from:
+            # Incremental: only items newer than what we already store.
+            # The window is small, so allow the max page size to avoid gaps.
+            params["time_from"] = time_from
+            params["sort"] = "LATEST"
+            params["limit"] = 1000
         data = self._make_request(params)
         feed = data.get("feed", [])
         return pd.DataFrame(feed)
@@ -115,6 +165,9 @@ class AlphaVantageFetcher(BaseFetcher):
         }
         data = self._make_request(params)
         
+        # "" only for a real payload without segments, so callers can cache the miss
+        if "transcript" not in data:
+            raise ValueError(f"Alpha Vantage returned no transcript payload for {symbol} {quarter}: {list(data)}")
         transcript_segments = data.get("transcript", [])
         if not transcript_segments:
             return ""
@@ -0,0 +1,44 @@
+import pandas as pd
+from typing import Optional
+from .base import BaseFetcher
+from ..analytics.engine import AnalyticsEngine
+
+class LocalAnalyticsFetcher(BaseFetcher):
+    """
+    由本地价格数据计算高级分析指标 (均值/标准差/相关性/beta)。
+    在 CompositeFetcher 中排在 Alpha Vantage 之前，本地没有价格数据时返回空结果以触发回退。
+    其余数据类型不提供。
+    """
+    def __init__(self, base_dir: str = "data", window: Optional[int] = None):
+        self.engine = AnalyticsEngine(base_dir)
+        self.window = window
+
+    def fetch_price_history(self, symbol: str, start_date: str, end_date: str, adjusted: bool = True) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def fetch_balance_sheet(self, symbol: str) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def fetch_cash_flow(self, symbol: str) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def fetch_income_statement(self, symbol: str) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def fetch_company_info(self, symbol: str) -> dict:
+        return {}
+
+    def fetch_insider_transactions(self, symbol: str) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def fetch_recommendations(self, symbol: str) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def fetch_news_sentiment(self, symbol: str, time_from: Optional[str] = None) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    def fetch_earnings_call_transcript(self, symbol: str, quarter: Optional[str] = None) -> str:
+        return ""
+
+    def fetch_advanced_analytics(self, symbol: str) -> dict:
+        return self.engine.symbol_analytics(symbol, self.window)
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+from typing import Optional, Callable, Any, Dict, List
+from ..utils.quota import DailyQuota, QuotaExhaustedError
+from ..utils.tracing import span
+
+class AVJob:
+    """
+    A unit of Alpha Vantage work.
+    `key` identifies the job across runs (e.g. "AAPL:transcripts"),
+    `last_updated` is the epoch time the data was last refreshed (None = never),
+    `fallback` (optional) runs instead when the job is deferred, e.g. the same fetch without Alpha Vantage.
+    """
+    def __init__(self, key: str, func: Callable[[], Any], priority: int = 0, last_updated: Optional[float] = None,
+                 fallback: Optional[Callable[[], Any]] = None):
+        self.key = key
+        self.func = func
+        self.priority = priority
+        self.last_updated = last_updated
+        self.fallback = fallback
+
+class AlphaVantageScheduler:
+    """
+    Alpha Vantage 配额感知调度器。
+    按优先级和数据陈旧程度排序执行任务；每日配额用尽时，
+    剩余任务被记录为 deferred，下次运行时优先执行，而不是继续消耗无效调用。
+    """
+    # Jobs deferred by an earlier run are ranked this much higher
+    DEFERRED_BOOST = 1
+
+    def __init__(self, quota: Optional[DailyQuota] = None,
+                 state_path: str = os.path.join("data", ".alpha_vantage_deferred.json"),
+                 max_wait: float = 70.0, max_retries: int = 2):
+        self.quota = quota
+        self.state_path = state_path
+        # Short-term (per-minute) limits are waited out; anything longer defers the job
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.jobs: List[AVJob] = []
+        self.deferred = self._load_deferred()
+
+    def _load_deferred(self) -> Dict[str, float]:
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Warning: Could not read deferred jobs {self.state_path}: {e}")
+        return {}
+
+    def _save_deferred(self):
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump(self.deferred, f, indent=4)
+
+    def submit(self, key: str, func: Callable[[], Any], priority: int = 0, last_updated: Optional[float] = None,
+               fallback: Optional[Callable[[], Any]] = None):
+        self.jobs.append(AVJob(key, func, priority, last_updated, fallback))
+
+    def _rank(self, job: AVJob):
+        priority = job.priority + (self.DEFERRED_BOOST if job.key in self.deferred else 0)
+        # Never-fetched data is the stalest of all
+        last_updated = job.last_updated if job.last_updated is not None else 0.0
+        return (-priority, last_updated)
+
+    def run(self) -> Dict[str, Any]:
+        """Run queued jobs in rank order; returns {key: result} for the jobs that completed."""
+        queue = sorted(self.jobs, key=self._rank)
+        self.jobs = []
+        results = {}
+
+        for i, job in enumerate(queue):
+            if self.quota is not None and not self.quota.available():
+                self._defer(queue[i:])
+                break
+
+            try:
+                results[job.key] = self._run_job(job)
+                self.deferred.pop(job.key, None)
+            except QuotaExhaustedError as e:
+                print(f"Alpha Vantage quota exhausted while running {job.key}: {e}")
+                self._defer(queue[i:])
+                break
+            except Exception as e:
+                print(f"Error running {job.key}: {e}")
+
+        self._save_deferred()
+        return results
+
+    def _run_job(self, job: AVJob) -> Any:
+        retries = 0
+        while True:
+            try:
+                with span(job.key, cat="job", priority=job.priority, attempt=retries + 1):
+                    return job.func()
+            except QuotaExhaustedError as e:
+                if e.retry_after is None or e.retry_after > self.max_wait or retries >= self.max_retries:
+                    raise
+                retries += 1
+                print(f"Rate limited on {job.key}, retrying in {e.retry_after:.0f}s...")
+                with span("retry_wait", cat="wait", job=job.key):
+                    time.sleep(e.retry_after)
+
+    def _defer(self, jobs: List[AVJob]):
+        now = time.time()
+        for job in jobs:
+            self.deferred.setdefault(job.key, now)
+        print(f"Deferred {len(jobs)} Alpha Vantage job(s) to the next quota window: "
+              f"{', '.join(job.key for job in jobs)}")
+        # Deferred jobs stay boosted for the next run; their fallbacks fill in what they can now
+        for job in jobs:
+            if job.fallback is None:
+                continue
+            try:
+                with span(f"{job.key}:fallback", cat="job"):
+                    job.fallback()
+            except Exception as e:
+                print(f"Error running fallback for {job.key}: {e}")
@@ -8,8 +8,8 @@ class BaseFetcher(ABC):
     """
     
     @abstractmethod
-    def fetch_price_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """获取历史价格数据 (OHLCV)"""
+    def fetch_price_history(self, symbol: str, start_date: str, end_date: str, adjusted: bool = True) -> pd.DataFrame:
+        """获取历史价格数据 (OHLCV)。adjusted=False 时返回原始成交价及 Dividends / Stock Splits 列 (数据源支持时)"""
         pass
 
     @abstractmethod
@@ -43,8 +43,8 @@ class BaseFetcher(ABC):
         pass
 
     @abstractmethod
-    def fetch_news_sentiment(self, symbol: str) -> pd.DataFrame:
-        """获取新闻及情感数据"""
+    def fetch_news_sentiment(self, symbol: str, time_from: Optional[str] = None) -> pd.DataFrame:
+        """获取新闻及情感数据 (time_from: 只返回该时间之后的新闻，格式 YYYYMMDDTHHMM)"""
         pass
 
     @abstractmethod
@@ -1,61 +1,168 @@
 import pandas as pd
 from typing import Optional, List, Any
 from .base import BaseFetcher
-from .yfinance_fetcher import YFinanceFetcher
-from .alpha_vantage_fetcher import AlphaVantageFetcher
-from .local_fetcher import LocalFetcher
+from ..utils.tracing import span
 import os
 
 class CompositeFetcher(BaseFetcher):
     """
     组合获取器，支持多数据源回退机制。
-    默认优先使用 local -> yfinance -> alpha_vantage。
+    默认优先使用 local -> yfinance -> local_analytics -> alpha_vantage。
+    各数据源 (及其依赖的 yfinance / requests 等模块) 在第一次被用到时才构建。
     """
+    DEFAULT_PRIORITY = ["local", "yfinance", "local_analytics", "alpha_vantage"]
+    # Sources backed by files on disk; an empty result from them never means "upstream has nothing"
+    LOCAL_SOURCES = ("local", "local_analytics")
+
     def __init__(self, api_key: Optional[str] = None, priority: Optional[List[str]] = None):
-        self.local = LocalFetcher()
-        self.yf = YFinanceFetcher()
-        # Alpha Vantage requires API key, might be None if not provided/env var set
-        try:
-            self.av = AlphaVantageFetcher(api_key=api_key)
-        except ValueError:
-            self.av = None
-
-        self.fetchers = []
-        
-        # Default priority: local -> yfinance -> alpha_vantage
-        if priority:
-            for p in priority:
-                if p == "local":
-                    self.fetchers.append(self.local)
-                elif p == "yfinance":
-                    self.fetchers.append(self.yf)
-                elif p == "alpha_vantage" and self.av:
-                    self.fetchers.append(self.av)
-        else:
-            # Default order
-            self.fetchers.append(self.local)
-            self.fetchers.append(self.yf)
-            if self.av:
-                self.fetchers.append(self.av)
-
-    def _run_with_fallback(self, method_name: str, *args, **kwargs) -> Any:
+        self.api_key = api_key
+        self.priority = [p for p in (priority or self.DEFAULT_PRIORITY) if p in self.DEFAULT_PRIORITY]
+        self._instances = {}
+        # Name of the source that answered the last request, e.g. "yfinance"
+        self.last_source = None
+        # Sources that completed the last request without error but had nothing to return
+        self.empty_sources = []
+
+    def _get_fetcher(self, name: str) -> Optional[BaseFetcher]:
+        if name not in self._instances:
+            self._instances[name] = self._build_fetcher(name)
+        return self._instances[name]
+
+    def _build_fetcher(self, name: str) -> Optional[BaseFetcher]:
+        if name == "local":
+            from .local_fetcher import LocalFetcher
+            if os.environ.get("SENDATA_ARROW_DIR"):
+                # Agent fleets on one host attach to shared memory-mapped Arrow prices
+                from ..storage.arrow_store import ArrowStore
+                return LocalFetcher(arrow_store=ArrowStore())
+            return LocalFetcher()
+        if name == "yfinance":
+            from .yfinance_fetcher import YFinanceFetcher
+            return YFinanceFetcher()
+        if name == "local_analytics":
+            # Advanced analytics computed from stored prices, saves an AV call per symbol
+            from .analytics_fetcher import LocalAnalyticsFetcher
+            return LocalAnalyticsFetcher()
+        if name == "alpha_vantage":
+            # Alpha Vantage requires API key, might be None if not provided/env var set
+            from .alpha_vantage_fetcher import AlphaVantageFetcher
+            try:
+                return AlphaVantageFetcher(api_key=self.api_key)
+            except ValueError:
+                return None
+        raise ValueError(f"Unknown fetcher: {name}")
+
+    def subset(self, names: List[str]) -> "CompositeFetcher":
+        """
+        A fetcher over the same (lazily built, shared) sources restricted to `names`, in this fetcher's order.
+        Lets callers keep Alpha Vantage calls on the quota-aware scheduler and everything else inline.
+        """
+        view = CompositeFetcher(api_key=self.api_key, priority=[p for p in self.priority if p in names])
+        view._instances = self._instances
+        return view
+
+    @property
+    def local(self):
+        return self._get_fetcher("local")
+
+    @property
+    def yf(self):
+        return self._get_fetcher("yfinance")
+
+    @property
+    def analytics(self):
+        return self._get_fetcher("local_analytics")
+
+    @property
+    def av(self):
+        return self._get_fetcher("alpha_vantage")
+
+    @property
+    def catalog(self):
+        if "catalog" not in self._instances:
+            from ..storage.catalog import DataCatalog
+            self._instances["catalog"] = DataCatalog(os.path.join(self.local.base_dir, "catalog.db"))
+        return self._instances["catalog"]
+
+    def _iter_fetchers(self):
+        # Later sources are only built if earlier ones didn't satisfy the request
+        for name in self.priority:
+            fetcher = self._get_fetcher(name)
+            if fetcher is not None:
+                yield name, fetcher
+
+    @property
+    def fetchers(self) -> List[BaseFetcher]:
+        return [fetcher for _, fetcher in self._iter_fetchers()]
+
+    # Catalog (symbol, category) for LocalFetcher methods
+    LOCAL_CATEGORIES = {
+        "fetch_price_history": "price_history",
+        "fetch_balance_sheet": "balance_sheet",
+        "fetch_cash_flow": "cash_flow",
+        "fetch_income_statement": "income_statement",
+        "fetch_company_info": "company_info",
+        "fetch_insider_transactions": "insider_transactions",
+        "fetch_recommendations": "recommendations",
+        "fetch_news_sentiment": "news_sentiment",
+        "fetch_advanced_analytics": "advanced_analytics",
+    }
+
+    def _local_can_satisfy(self, method_name: str, *args) -> bool:
+        """
+        Ask the catalog whether LocalFetcher has the data, without opening files.
+        Trees saved before the catalog existed are always tried.
+        """
+        catalog = self.catalog
+        if catalog.is_empty():
+            return True
+        if method_name == "fetch_top_gainers_losers":
+            return catalog.covers("MARKET", "top_gainers_losers")
+        if method_name == "fetch_earnings_call_transcript":
+            symbol, quarter = args[0], args[1] if len(args) > 1 else None
+            return bool(quarter) and catalog.covers(symbol, f"earnings_transcript_{quarter}")
+        category = self.LOCAL_CATEGORIES.get(method_name)
+        if category is None:
+            return True
+        if method_name == "fetch_price_history":
+            return catalog.covers(args[0], category, args[1], args[2])
+        return catalog.covers(args[0], category)
+
+    def _run_with_fallback(self, method_name: str, *args, empty_ok: bool = False, **kwargs) -> Any:
+        """
+        Try sources in priority order until one returns a non-empty result.
+        With `empty_ok`, an empty result from a remote source is a valid answer (e.g. "no news since
+        time_from") and stops the chain; an empty result from LOCAL_SOURCES still falls through.
+        """
         last_error = None
-        for fetcher in self.fetchers:
+        self.last_source = None
+        self.empty_sources = []
+        for name, fetcher in self._iter_fetchers():
             try:
                 if not hasattr(fetcher, method_name):
                     continue
+                if name == "local" and not self._local_can_satisfy(method_name, *args):
+                    continue
                 
                 method = getattr(fetcher, method_name)
-                result = method(*args, **kwargs)
+                with span(f"{name}.{method_name}", cat="fetch", source=name):
+                    result = method(*args, **kwargs)
                 
                 # Check for "empty" results to trigger fallback
                 if isinstance(result, pd.DataFrame):
                     if not result.empty:
+                        self.last_source = name
                         return result
                 elif isinstance(result, (dict, list, str)):
                     if result:
+                        self.last_source = name
                         return result
                 elif result is not None:
+                    self.last_source = name
+                    return result
+                self.empty_sources.append(name)
+                if empty_ok and name not in self.LOCAL_SOURCES:
+                    self.last_source = name
                     return result
                     
             except Exception as e:
@@ -76,8 +183,8 @@ class CompositeFetcher(BaseFetcher):
             
         return None
 
-    def fetch_price_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-        res = self._run_with_fallback("fetch_price_history", symbol, start_date, end_date)
+    def fetch_price_history(self, symbol: str, start_date: str, end_date: str, adjusted: bool = True) -> pd.DataFrame:
+        res = self._run_with_fallback("fetch_price_history", symbol, start_date, end_date, adjusted=adjusted)
         return res if res is not None else pd.DataFrame()
 
     def fetch_balance_sheet(self, symbol: str) -> pd.DataFrame:
@@ -104,8 +211,9 @@ class CompositeFetcher(BaseFetcher):
         res = self._run_with_fallback("fetch_recommendations", symbol)
         return res if res is not None else pd.DataFrame()
 
-    def fetch_news_sentiment(self, symbol: str) -> pd.DataFrame:
-        res = self._run_with_fallback("fetch_news_sentiment", symbol)
+    def fetch_news_sentiment(self, symbol: str, time_from: Optional[str] = None) -> pd.DataFrame:
+        # Nothing newer than time_from is an answer, not a failure to fall back from (saves AV quota)
+        res = self._run_with_fallback("fetch_news_sentiment", symbol, time_from=time_from, empty_ok=bool(time_from))
         return res if res is not None else pd.DataFrame()
 
     def fetch_earnings_call_transcript(self, symbol: str, quarter: Optional[str] = None) -> str:
@@ -3,6 +3,9 @@ import json
 import pandas as pd
 from typing import Optional
 from .base import BaseFetcher
+from ..storage.fundamentals_store import FundamentalsStore
+from ..storage.news_store import NewsStore
+from ..storage.corporate_actions import adjust_prices, LEGACY_PRICE_FILE
 
 class LocalFetcher(BaseFetcher):
     """
@@ -10,14 +13,22 @@ class LocalFetcher(BaseFetcher):
     数据目录结构应符合 FileSaver 的保存格式：
     base_dir/
         SYMBOL/
-            price_history.csv
+            price_history.csv       (原始成交价，读取时按 corporate_actions.csv 复权)
+            price_history.v1.csv    (旧版已复权数据，补齐原始数据之前的日期，直到下载覆盖其范围)
+            corporate_actions.csv
             company_info.json
             ...
         MARKET/
             top_gainers_losers.json
+            news/YYYY-MM.csv
+        fundamentals.db   (balance_sheet / cash_flow / income_statement)
+    传入 arrow_store 时，价格历史从共享的内存映射 Arrow 文件读取，而不是每个进程各自解析 CSV。
     """
-    def __init__(self, base_dir: str = "data"):
+    def __init__(self, base_dir: str = "data", arrow_store=None):
         self.base_dir = base_dir
+        self.arrow_store = arrow_store
+        self.fundamentals_store = FundamentalsStore(os.path.join(base_dir, "fundamentals.db"))
+        self.news_store = NewsStore(base_dir)
 
     def _get_file_path(self, symbol: str, filename: str, ext: str) -> str:
         return os.path.join(self.base_dir, symbol, f"{filename}.{ext}")
@@ -48,22 +59,42 @@ class LocalFetcher(BaseFetcher):
                 print(f"Error reading local JSON {path}: {e}")
         return {}
 
-    def fetch_price_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def fetch_price_history(self, symbol: str, start_date: str, end_date: str, adjusted: bool = True) -> pd.DataFrame:
+        if self.arrow_store is not None and adjusted:
+            try:
+                return self.arrow_store.read_prices(symbol, start_date, end_date)
+            except Exception as e:
+                print(f"Error reading Arrow price history for {symbol}: {e}")
         df = self._read_csv(symbol, "price_history")
+        if adjusted and not df.empty:
+            # Stored bars are as traded; factors span the whole history, so adjust before filtering
+            df = adjust_prices(df, self._read_csv(symbol, "corporate_actions"),
+                               legacy=self._read_csv(symbol, LEGACY_PRICE_FILE))
         if not df.empty and isinstance(df.index, pd.DatetimeIndex):
             # Filter by date range
             mask = (df.index >= start_date) & (df.index <= end_date)
             return df.loc[mask]
         return df
 
+    def _read_statement(self, symbol: str, statement: str) -> pd.DataFrame:
+        if os.path.exists(self.fundamentals_store.db_path):
+            try:
+                df = self.fundamentals_store.get_statement(symbol, statement)
+                if not df.empty:
+                    return df
+            except Exception as e:
+                print(f"Error reading {statement} for {symbol} from fundamentals store: {e}")
+        # Data saved before the long-format store existed
+        return self._read_csv(symbol, statement)
+
     def fetch_balance_sheet(self, symbol: str) -> pd.DataFrame:
-        return self._read_csv(symbol, "balance_sheet")
+        return self._read_statement(symbol, "balance_sheet")
 
     def fetch_cash_flow(self, symbol: str) -> pd.DataFrame:
-        return self._read_csv(symbol, "cash_flow")
+        return self._read_statement(symbol, "cash_flow")
 
     def fetch_income_statement(self, symbol: str) -> pd.DataFrame:
-        return self._read_csv(symbol, "income_statement")
+        return self._read_statement(symbol, "income_statement")
 
     def fetch_company_info(self, symbol: str) -> dict:
         return self._read_json(symbol, "company_info")
@@ -74,8 +105,12 @@ class LocalFetcher(BaseFetcher):
     def fetch_recommendations(self, symbol: str) -> pd.DataFrame:
         return self._read_csv(symbol, "recommendations")
 
-    def fetch_news_sentiment(self, symbol: str) -> pd.DataFrame:
-        return self._read_csv(symbol, "news_sentiment")
+    def fetch_news_sentiment(self, symbol: str, time_from: Optional[str] = None) -> pd.DataFrame:
+        df = self.news_store.read(symbol, time_from=time_from)
+        if df.empty and not time_from:
+            # Data saved before the news archive existed
+            return self._read_csv(symbol, "news_sentiment")
+        return df
 
     def fetch_earnings_call_transcript(self, symbol: str, quarter: Optional[str] = None) -> str:
         if not quarter:
@@ -5,6 +5,9 @@ import random
 from .base import BaseFetcher
 from typing import Optional
 from ..utils.decorators import random_delay
+from ..utils.tracing import span
+from ..storage.news_items import normalize_news
+from ..storage.corporate_actions import unadjust_splits
 
 class YFinanceFetcher(BaseFetcher):
     """
@@ -12,10 +15,23 @@ class YFinanceFetcher(BaseFetcher):
     """
 
     @random_delay(2.0, 5.0)
-    def fetch_price_history(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def fetch_price_history(self, symbol: str, start_date: str, end_date: str, adjusted: bool = True) -> pd.DataFrame:
         ticker = yf.Ticker(symbol)
-        # auto_adjust=True 会自动调整股价（类似 Adj Close），reference project 中也有用到
-        df = ticker.history(start=start_date, end=end_date, auto_adjust=True)
+        if adjusted:
+            # auto_adjust=True 会自动调整股价（类似 Adj Close），reference project 中也有用到
+            with span("http", cat="http", endpoint="history", symbol=symbol):
+                df = ticker.history(start=start_date, end=end_date, auto_adjust=True)
+        else:
+            # 原始成交价 + Dividends / Stock Splits 列，供 FileSaver 分开存储、读取时再复权
+            with span("http", cat="http", endpoint="history", symbol=symbol):
+                df = ticker.history(start=start_date, end=end_date, auto_adjust=False, actions=True)
+            if not df.empty:
+                # Yahoo restates bars for splits up to today, not just those inside [start, end]
+                splits = ticker.splits
+                if splits is not None and not splits.empty:
+                    df = unadjust_splits(df, splits.to_frame("Stock Splits"))
+                elif "Stock Splits" in df.columns:
+                    df = unadjust_splits(df, df[["Stock Splits"]])
         if df.empty:
             print(f"Warning: No price data found for {symbol}")
         return df
@@ -52,12 +68,17 @@ class YFinanceFetcher(BaseFetcher):
         return ticker.recommendations
 
     @random_delay(2.0, 5.0)
-    def fetch_news_sentiment(self, symbol: str) -> pd.DataFrame:
+    def fetch_news_sentiment(self, symbol: str, time_from: Optional[str] = None) -> pd.DataFrame:
         ticker = yf.Ticker(symbol)
         news = ticker.news
-        if news:
-            return pd.DataFrame(news)
-        return pd.DataFrame()
+        if not news:
+            return pd.DataFrame()
+        df = pd.DataFrame(news)
+        if time_from:
+            # yfinance has no server-side filter; drop items we already have
+            published = pd.DataFrame([normalize_news(item) for item in news])["time_published"]
+            df = df[(published >= time_from).to_numpy()]
+        return df
 
     def fetch_earnings_call_transcript(self, symbol: str, quarter: Optional[str] = None) -> str:
         # yfinance does not provide earnings call transcripts directly
@@ -0,0 +1,2 @@
+from .sen_stock import SenStock
+from .quote_service import QuoteService, get_quote_service
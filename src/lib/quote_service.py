@@ -0,0 +1,189 @@
+import time
+import threading
+from typing import Optional, Callable, Dict, List, Iterable
+
+def yfinance_batch_quotes(symbols: List[str]) -> Dict[str, dict]:
+    """
+    Poll the latest intraday bar for many symbols with a single yf.download call.
+    Returns {symbol: {"price", "open", "high", "low", "volume", "as_of"}}.
+    """
+    import yfinance as yf
+    import pandas as pd
+
+    df = yf.download(
+        tickers=" ".join(symbols), period="1d", interval="1m",
+        group_by="ticker", auto_adjust=False, progress=False
+    )
+    quotes = {}
+    if df is None or df.empty:
+        return quotes
+
+    for symbol in symbols:
+        if isinstance(df.columns, pd.MultiIndex):
+            if symbol not in df.columns.get_level_values(0):
+                continue
+            bars = df[symbol]
+        else:
+            bars = df
+        bars = bars.dropna(subset=["Close"])
+        if bars.empty:
+            continue
+        last = bars.iloc[-1]
+        quotes[symbol] = {
+            "price": float(last["Close"]),
+            "open": float(bars["Open"].iloc[0]),
+            "high": float(bars["High"].max()),
+            "low": float(bars["Low"].min()),
+            "volume": float(bars["Volume"].sum()),
+            "as_of": bars.index[-1].isoformat(),
+        }
+    return quotes
+
+class QuoteService:
+    """
+    实时行情缓存服务。
+    维护一个订阅集合，每个刷新周期对全部订阅标的只做一次批量上游轮询，
+    所有读取都从内存快照返回，并附带 fetched_at / age / stale 元数据。
+    多个 Agent 并发读取时，同一时刻只有一个线程在刷新，其余线程等待并复用结果。
+    """
+    def __init__(self, poll_func: Optional[Callable[[List[str]], Dict[str, dict]]] = None,
+                 interval: float = 15.0, max_staleness: Optional[float] = None, batch_size: int = 100):
+        self.poll_func = poll_func or yfinance_batch_quotes
+        # Snapshots younger than `interval` are served without polling
+        self.interval = interval
+        # Quotes older than this are flagged as stale (e.g. after upstream failures)
+        self.max_staleness = max_staleness if max_staleness is not None else interval * 4
+        self.batch_size = batch_size
+        # poll_func calls (one per batch) and symbols sent upstream; yf.download makes one
+        # HTTP request per ticker, so for the default poller the latter is the real request count
+        self.upstream_polls = 0
+        self.upstream_symbols = 0
+
+        self._subscriptions = set()
+        self._snapshot: Dict[str, dict] = {}
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def subscribe(self, symbols: Iterable[str]):
+        with self._lock:
+            self._subscriptions.update(s.upper() for s in symbols)
+
+    def unsubscribe(self, symbols: Iterable[str]):
+        with self._lock:
+            for s in symbols:
+                self._subscriptions.discard(s.upper())
+                self._snapshot.pop(s.upper(), None)
+
+    @property
+    def subscriptions(self) -> List[str]:
+        with self._lock:
+            return sorted(self._subscriptions)
+
+    def get_quote(self, symbol: str) -> dict:
+        return self.get_quotes([symbol]).get(symbol.upper(), {})
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """
+        Return quotes for symbols, subscribing to any new ones.
+        Triggers at most one coalesced refresh if the snapshot is older than `interval`
+        or some requested symbols have never been polled.
+        """
+        symbols = [s.upper() for s in symbols]
+        self.subscribe(symbols)
+        if self._needs_refresh(symbols):
+            self._coalesced_refresh(symbols)
+        return self._read(symbols)
+
+    def _needs_refresh(self, symbols: List[str]) -> bool:
+        with self._lock:
+            if time.time() - self._last_refresh >= self.interval:
+                return True
+            return any(s not in self._snapshot for s in symbols)
+
+    def _coalesced_refresh(self, symbols: List[str]):
+        with self._refresh_lock:
+            # Another reader may have refreshed while we were waiting for the lock
+            if not self._needs_refresh(symbols):
+                return
+            with self._lock:
+                expired = time.time() - self._last_refresh >= self.interval
+                missing = [s for s in self._subscriptions if s not in self._snapshot]
+            if expired:
+                self.refresh()
+            else:
+                self._poll(missing)
+
+    def refresh(self):
+        """Poll every subscribed symbol, `batch_size` symbols per upstream request."""
+        with self._lock:
+            symbols = sorted(self._subscriptions)
+            self._last_refresh = time.time()
+        self._poll(symbols)
+
+    def _poll(self, symbols: List[str]):
+        for i in range(0, len(symbols), self.batch_size):
+            batch = symbols[i:i + self.batch_size]
+            with self._lock:
+                self.upstream_polls += 1
+                self.upstream_symbols += len(batch)
+            try:
+                quotes = self.poll_func(batch)
+            except Exception as e:
+                # Keep serving the previous snapshot; its age will show it is stale
+                print(f"Warning: Quote poll failed for {len(batch)} symbols: {e}")
+                continue
+            fetched_at = time.time()
+            with self._lock:
+                for symbol, quote in quotes.items():
+                    self._snapshot[symbol.upper()] = {**quote, "symbol": symbol.upper(), "fetched_at": fetched_at}
+                # Symbols upstream did not return (bad ticker, delisted, no bars) get a negative entry,
+                # so they follow the same `interval` instead of forcing a poll on every read
+                for symbol in batch:
+                    self._snapshot.setdefault(symbol, {"symbol": symbol, "price": None, "fetched_at": fetched_at})
+
+    def _read(self, symbols: List[str]) -> Dict[str, dict]:
+        now = time.time()
+        result = {}
+        with self._lock:
+            for symbol in symbols:
+                quote = self._snapshot.get(symbol)
+                if quote is None:
+                    continue
+                age = now - quote["fetched_at"]
+                result[symbol] = {**quote, "age": age, "stale": age > self.max_staleness}
+        return result
+
+    def start(self):
+        """Refresh the subscription set in a background thread every `interval` seconds."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="QuoteService", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.subscriptions:
+                with self._refresh_lock:
+                    self.refresh()
+            self._stop_event.wait(self.interval)
+
+_default_service = None
+_default_lock = threading.Lock()
+
+def get_quote_service() -> QuoteService:
+    """Process-wide QuoteService shared by all SenStock instances."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = QuoteService()
+        return _default_service
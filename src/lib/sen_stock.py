@@ -0,0 +1,41 @@
+import pandas as pd
+from typing import Optional
+from datetime import datetime, timedelta
+from ..fetcher.composite_fetcher import CompositeFetcher
+from .quote_service import QuoteService, get_quote_service
+
+class SenStock:
+    """
+    Agent 调用的主要入口，封装单只股票的数据查询。
+    历史/基本面数据走 CompositeFetcher (local -> 数据源回退)，
+    实时行情走进程内共享的 QuoteService。
+    """
+    def __init__(self, symbol: str, source: str = "yfinance", api_key: Optional[str] = None,
+                 quote_service: Optional[QuoteService] = None):
+        self.symbol = symbol.upper()
+        priority = ["local", "yfinance", "local_analytics", "alpha_vantage"]
+        if source == "alpha_vantage":
+            priority = ["local", "local_analytics", "alpha_vantage", "yfinance"]
+        self.fetcher = CompositeFetcher(api_key=api_key, priority=priority)
+        self.quote_service = quote_service or get_quote_service()
+
+    def get_quote(self) -> dict:
+        """最新行情快照 (price/open/high/low/volume/as_of + fetched_at/age/stale)"""
+        return self.quote_service.get_quote(self.symbol)
+
+    def get_current_price(self) -> Optional[float]:
+        return self.get_quote().get("price")
+
+    def get_price_history(self, start_date: str, end_date: str) -> pd.DataFrame:
+        return self.fetcher.fetch_price_history(self.symbol, start_date, end_date)
+
+    def get_history(self, days: int = 30) -> pd.DataFrame:
+        end = datetime.now()
+        start = end - timedelta(days=days)
+        return self.get_price_history(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+
+    def get_company_info(self) -> dict:
+        return self.fetcher.fetch_company_info(self.symbol)
+
+    def get_news_sentiment(self) -> pd.DataFrame:
+        return self.fetcher.fetch_news_sentiment(self.symbol)
@@ -1,9 +1,12 @@
 import argparse
 import sys
 import os
-from dotenv import load_dotenv
-from src.fetcher.composite_fetcher import CompositeFetcher
-from src.storage.saver import FileSaver
+import glob
+from src.storage.transcript_cache import TranscriptMissCache, quarter_end
+from src.fetcher.av_scheduler import AlphaVantageScheduler
+from src.utils.quota import QuotaExhaustedError
+from src.utils import tracing
+from src.utils.tracing import span
 from datetime import datetime, timedelta
 import time
 import random
@@ -14,8 +17,8 @@ import random
 os.environ['http_proxy'] = 'http://127.0.0.1:15236'
 os.environ['https_proxy'] = 'http://127.0.0.1:15236'
 
-# Load environment variables from .env file
-load_dotenv()
+# pandas, yfinance, requests and dotenv are imported inside the functions that need them,
+# so `--help`, `--search` and other short invocations start quickly (see tests/test_startup.py)
 
 def get_quarters_between(start_date_str, end_date_str):
     """Generate a list of quarters between start_date and end_date (inclusive)"""
@@ -78,123 +81,301 @@ def get_recent_quarters(n=4):
             
     return quarters
 
+def latest_mtime(directory, pattern):
+    """Most recent modification time of files matching pattern, or None if there are none"""
+    paths = glob.glob(os.path.join(directory, pattern))
+    return max(os.path.getmtime(p) for p in paths) if paths else None
+
+def catalog_updated(saver, symbol, category):
+    """Epoch time the catalog last recorded (symbol, category), or None if it never did"""
+    entry = saver.catalog.get(symbol, category)
+    if not entry or not entry["updated_at"]:
+        return None
+    return datetime.fromisoformat(entry["updated_at"]).timestamp()
+
+# Per-symbol datasets in download order; each is saved under the same catalog category
+SYMBOL_CATEGORIES = ["price_history", "balance_sheet", "cash_flow", "income_statement", "company_info",
+                     "insider_transactions", "recommendations", "news_sentiment"]
+
+def make_category_job(fetcher, saver, symbol, category, start_date, end_date):
+    """
+    Fetch one per-symbol dataset through `fetcher` and save it.
+    The job returns whether a source answered (an empty "no new news" answer counts).
+    """
+    def job():
+        with span(category, cat="category", symbol=symbol):
+            print(f"  Fetching {category.replace('_', ' ')} for {symbol}...")
+            if category == "price_history":
+                # Raw bars + actions; adjustment happens when the history is read
+                data = fetcher.fetch_price_history(symbol, start_date, end_date, adjusted=False)
+            elif category == "news_sentiment":
+                # Only ask for items newer than the archive's latest timestamp
+                data = fetcher.fetch_news_sentiment(symbol, time_from=saver.news_store.time_from(symbol))
+            else:
+                data = getattr(fetcher, f"fetch_{category}")(symbol)
+            if category == "company_info":
+                saver.save_json(symbol, category, data, source=fetcher.last_source)
+            else:
+                saver.save_dataframe(symbol, category, data, source=fetcher.last_source)
+            return fetcher.last_source is not None
+
+    return job
+
+def collect_symbol(fetcher, saver, scheduler, symbol, start_date, end_date, av_first=False):
+    """
+    Fetch every per-symbol dataset. Alpha Vantage is only ever called from scheduler jobs, so the daily
+    quota, ranking and deferral apply to it: with `av_first` each dataset is an AV job whose fallback
+    (when deferred) uses the other sources; otherwise the other sources run inline and AV is queued
+    only for datasets they could not answer.
+    """
+    others = fetcher.subset([p for p in fetcher.priority if p != "alpha_vantage"])
+    alpha_vantage = fetcher.subset(["alpha_vantage"])
+    has_av = fetcher.av is not None
+
+    for category in SYMBOL_CATEGORIES:
+        key = f"{symbol}:{category}"
+        if av_first and has_av:
+            scheduler.submit(
+                key,
+                make_category_job(fetcher, saver, symbol, category, start_date, end_date),
+                last_updated=catalog_updated(saver, symbol, category),
+                fallback=make_category_job(others, saver, symbol, category, start_date, end_date)
+            )
+            continue
+
+        try:
+            answered = make_category_job(others, saver, symbol, category, start_date, end_date)()
+        except Exception as e:
+            print(f"  Error fetching {category.replace('_', ' ')}: {e}")
+            answered = False
+        if not answered and has_av:
+            scheduler.submit(
+                key,
+                make_category_job(alpha_vantage, saver, symbol, category, start_date, end_date),
+                last_updated=catalog_updated(saver, symbol, category)
+            )
+
+def make_transcript_job(fetcher, saver, symbol, quarters, miss_cache, force=False, max_consecutive_misses=2):
+    """
+    Fetch transcripts newest-first, skipping quarters that are already stored,
+    not finished yet, or recently confirmed missing (unless `force`). Stops early after
+    `max_consecutive_misses` missing quarters in a row, since coverage
+    for a symbol rarely resumes further back.
+    A quarter is cached as missing only when Alpha Vantage itself returned an empty transcript,
+    not when no source could answer.
+    """
+    now = datetime.now()
+    remaining = sorted((q for q in quarters if force or quarter_end(q) < now), reverse=True)
+    state = {"misses": 0}
+
+    def job():
+        print(f"  Fetching earnings call transcripts for {symbol}: {', '.join(remaining) or 'none'}...")
+        # Quarters are consumed as they complete so a retried job resumes where it stopped
+        while remaining:
+            if state["misses"] >= max_consecutive_misses:
+                print(f"    {state['misses']} consecutive quarters missing, skipping older: {', '.join(remaining)}")
+                break
+            q = remaining[0]
+            # Calls for a quarter that just ended may not have happened yet; those misses don't end coverage
+            pending = now - quarter_end(q) < TranscriptMissCache.RECENT_WINDOW
+
+            if saver.exists(symbol, f"earnings_transcript_{q}"):
+                state["misses"] = 0
+            elif not force and miss_cache.is_missing(symbol, q):
+                print(f"    Skipping {q}: no transcript (cached)")
+                if not pending:
+                    state["misses"] += 1
+            else:
+                try:
+                    transcript = fetcher.fetch_earnings_call_transcript(symbol, q)
+                    if transcript:
+                        # Save as text file or JSON
+                        saver.save_json(symbol, f"earnings_transcript_{q}", {"content": transcript}, source=fetcher.last_source)
+                        miss_cache.clear(symbol, q)
+                        state["misses"] = 0
+                        print(f"    Saved transcript for {q}")
+                    elif "alpha_vantage" in fetcher.empty_sources:
+                        miss_cache.record_miss(symbol, q)
+                        if not pending:
+                            state["misses"] += 1
+                        print(f"    No transcript found for {q}")
+                    else:
+                        print(f"    No source could answer for {q}, not caching the miss")
+                except QuotaExhaustedError:
+                    raise
+                except Exception as e:
+                    print(f"    Error fetching earnings transcript for {q}: {e}")
+            remaining.pop(0)
+
+    return job
+
+def make_analytics_job(fetcher, saver, symbol):
+    def job():
+        print(f"  Fetching advanced analytics for {symbol}...")
+        analytics = fetcher.fetch_advanced_analytics(symbol)
+        saver.save_json(symbol, "advanced_analytics", analytics, source=fetcher.last_source)
+        return analytics
+
+    return job
+
+def collect_analytics(fetcher, saver, scheduler, symbols):
+    """
+    Advanced analytics from local prices inline; symbols without local prices (or with too few bars)
+    get a separate Alpha Vantage job, so that call is ranked and counted against the daily quota.
+    """
+    local_analytics = fetcher.subset(["local_analytics"])
+    alpha_vantage = fetcher.subset(["alpha_vantage"])
+    for symbol in symbols:
+        analytics = {}
+        if saver.exists(symbol, "price_history", "csv"):
+            try:
+                with span("advanced_analytics", cat="category", symbol=symbol):
+                    analytics = make_analytics_job(local_analytics, saver, symbol)()
+            except Exception as e:
+                print(f"  Error computing advanced analytics for {symbol}: {e}")
+        if not analytics and fetcher.av is not None:
+            scheduler.submit(
+                f"{symbol}:advanced_analytics",
+                make_analytics_job(alpha_vantage, saver, symbol),
+                last_updated=latest_mtime(os.path.join(saver.base_dir, symbol), "advanced_analytics.json")
+            )
+
 def batch_download(symbols, start_date, end_date, source="yfinance", api_key=None, quarter=None, fetch_transcripts=False):
     # Initialize CompositeFetcher with priority based on source argument
-    # If source is yfinance, priority is [yfinance, alpha_vantage]
-    # If source is alpha_vantage, priority is [alpha_vantage, yfinance]
-    priority = ["yfinance", "alpha_vantage"]
+    # If source is yfinance, priority is [yfinance, local_analytics, alpha_vantage]
+    # If source is alpha_vantage, priority is [local_analytics, alpha_vantage, yfinance]
+    # local_analytics only answers advanced analytics, computed from the price history saved below
+    priority = ["yfinance", "local_analytics", "alpha_vantage"]
     if source == "alpha_vantage":
-        priority = ["alpha_vantage", "yfinance"]
+        priority = ["local_analytics", "alpha_vantage", "yfinance"]
         
+    from dotenv import load_dotenv
+    from src.fetcher.composite_fetcher import CompositeFetcher
+    from src.storage.saver import FileSaver
+
+    # Load environment variables from .env file
+    load_dotenv()
+
     fetcher = CompositeFetcher(api_key=api_key, priority=priority)
     saver = FileSaver(base_dir="data")
+    miss_cache = TranscriptMissCache(base_dir="data")
+    scheduler = AlphaVantageScheduler(quota=fetcher.av.quota if fetcher.av else None)
 
     # Market Movers (Alpha Vantage only, but CompositeFetcher handles it)
     if hasattr(fetcher, 'fetch_top_gainers_losers'):
-        try:
+        def fetch_movers():
             print("Fetching Top Gainers/Losers...")
             movers = fetcher.fetch_top_gainers_losers()
             if movers:
-                saver.save_json("MARKET", "top_gainers_losers", movers)
-        except Exception as e:
-            print(f"Error fetching top gainers/losers: {e}")
+                saver.save_json("MARKET", "top_gainers_losers", movers, source=fetcher.last_source)
+            return movers
+
+        scheduler.submit(
+            "MARKET:top_gainers_losers",
+            fetch_movers,
+            priority=2,
+            last_updated=latest_mtime(os.path.join(saver.base_dir, "MARKET"), "top_gainers_losers.json")
+        )
 
     for symbol in symbols:
-        print(f"Processing {symbol}...")
+        with span(symbol, cat="symbol"):
+            print(f"Processing {symbol}...")
         
-        # 1. Price History
-        try:
-            print(f"  Fetching price history...")
-            price_df = fetcher.fetch_price_history(symbol, start_date, end_date)
-            saver.save_dataframe(symbol, "price_history", price_df)
-        except Exception as e:
-            print(f"  Error fetching price history: {e}")
+            # 1-6. Prices, statements, company info, insiders, recommendations, news
+            collect_symbol(fetcher, saver, scheduler, symbol, start_date, end_date,
+                           av_first=source == "alpha_vantage")
 
-        # 2. Fundamentals
-        try:
-            print(f"  Fetching balance sheet...")
-            bs = fetcher.fetch_balance_sheet(symbol)
-            saver.save_dataframe(symbol, "balance_sheet", bs)
-        except Exception as e:
-            print(f"  Error fetching balance sheet: {e}")
+            # 7. Earnings Call Transcript (Alpha Vantage only, queued on the quota-aware scheduler)
+            if (quarter or fetch_transcripts) and fetcher.av is None:
+                print(f"  Skipping earnings call transcripts: no Alpha Vantage API key")
+            elif quarter or fetch_transcripts:
+                if quarter:
+                    quarters_to_fetch = [quarter]
+                else:
+                    # Use the date range to determine quarters
+                    quarters_to_fetch = get_quarters_between(start_date, end_date)
 
-        try:
-            print(f"  Fetching cash flow...")
-            cf = fetcher.fetch_cash_flow(symbol)
-            saver.save_dataframe(symbol, "cash_flow", cf)
-        except Exception as e:
-            print(f"  Error fetching cash flow: {e}")
+                scheduler.submit(
+                    f"{symbol}:transcripts",
+                    make_transcript_job(fetcher, saver, symbol, quarters_to_fetch, miss_cache,
+                                        force=bool(quarter)),
+                    priority=1,
+                    last_updated=latest_mtime(os.path.join(saver.base_dir, symbol), "earnings_transcript_*.json")
+                )
 
-        try:
-            print(f"  Fetching income statement...")
-            income = fetcher.fetch_income_statement(symbol)
-            saver.save_dataframe(symbol, "income_statement", income)
-        except Exception as e:
-            print(f"  Error fetching income statement: {e}")
+            print(f"Finished {symbol}.\n")
 
-        # 3. Company Info
-        try:
-            print(f"  Fetching company info...")
-            info = fetcher.fetch_company_info(symbol)
-            saver.save_json(symbol, "company_info", info)
-        except Exception as e:
-            print(f"  Error fetching company info: {e}")
+    # Prices queued on Alpha Vantage have to be stored before analytics are computed from them
+    print("Running Alpha Vantage jobs...")
+    with span("alpha_vantage_jobs", cat="scheduler"):
+        scheduler.run()
 
-        # 4. Insider Transactions
-        try:
-            print(f"  Fetching insider transactions...")
-            insider = fetcher.fetch_insider_transactions(symbol)
-            saver.save_dataframe(symbol, "insider_transactions", insider)
-        except Exception as e:
-            print(f"  Error fetching insider transactions: {e}")
+    # 8. Advanced Analytics
+    # Computed locally across the whole universe once all price histories are saved
+    collect_analytics(fetcher, saver, scheduler, symbols)
 
-        # 5. Recommendations
-        try:
-            print(f"  Fetching recommendations...")
-            recs = fetcher.fetch_recommendations(symbol)
-            saver.save_dataframe(symbol, "recommendations", recs)
-        except Exception as e:
-            print(f"  Error fetching recommendations: {e}")
+    if scheduler.jobs:
+        print("Running Alpha Vantage analytics jobs...")
+        with span("alpha_vantage_jobs", cat="scheduler"):
+            scheduler.run()
 
-        # 6. News & Sentiment
-        try:
-            print(f"  Fetching news & sentiment...")
-            news = fetcher.fetch_news_sentiment(symbol)
-            saver.save_dataframe(symbol, "news_sentiment", news)
-        except Exception as e:
-            print(f"  Error fetching news & sentiment: {e}")
+def search_saved_documents(query, symbols=None, quarter=None, sentiment=None, limit=20, raw=False):
+    import sqlite3
+    from src.storage.search_index import SearchIndex
 
-        # 7. Earnings Call Transcript
-        if quarter or fetch_transcripts:
-            if quarter:
-                quarters_to_fetch = [quarter]
-            else:
-                # Use the date range to determine quarters
-                quarters_to_fetch = get_quarters_between(start_date, end_date)
-                
-            print(f"  Fetching earnings call transcripts for: {', '.join(quarters_to_fetch)}...")
-            
-            for q in quarters_to_fetch:
-                try:
-                    transcript = fetcher.fetch_earnings_call_transcript(symbol, q)
-                    if transcript:
-                        # Save as text file or JSON
-                        saver.save_json(symbol, f"earnings_transcript_{q}", {"content": transcript})
-                        print(f"    Saved transcript for {q}")
-                    else:
-                        print(f"    No transcript found for {q}")
-                except Exception as e:
-                    print(f"    Error fetching earnings transcript for {q}: {e}")
+    index = SearchIndex(os.path.join("data", "search_index.db"))
+    try:
+        results = index.search(query, symbols=symbols, quarter=quarter, sentiment=sentiment, limit=limit, raw=raw)
+    except sqlite3.OperationalError as e:
+        print(f"Error: Invalid search query {query!r}: {e}")
+        print('With --raw-query the query uses FTS5 syntax, e.g. \'"supply chain"\', \'tariff OR tariffs\' or \'guid*\'; '
+              'drop --raw-query to search plain text.')
+        return
+    if not results:
+        print("No matching documents found.")
+    for r in results:
+        label = r["quarter"] or r["published"] or ""
+        print(f"[{r['symbol']}] {r['doc_type']} {label} (score {r['score']:.2f})")
+        print(f"  {r['title']}")
+        print(f"  {r['snippet']}")
 
-        # 8. Advanced Analytics
-        try:
-            print(f"  Fetching advanced analytics...")
-            analytics = fetcher.fetch_advanced_analytics(symbol)
-            saver.save_json(symbol, "advanced_analytics", analytics)
-        except Exception as e:
-            print(f"  Error fetching advanced analytics: {e}")
+def screen_fundamentals(expression, symbols=None):
+    from src.storage.fundamentals_store import FundamentalsStore
+    from src.analytics.screener import Screener
+    from pandas.errors import UndefinedVariableError
+
+    screener = Screener(FundamentalsStore(os.path.join("data", "fundamentals.db")))
+    try:
+        result = screener.screen(expression, symbols=symbols)
+    except UndefinedVariableError as e:
+        print(f"Error: {e} in --screen {expression!r}")
+        print(f"Available columns: {', '.join(screener.metrics(symbols).columns)}")
+        return
+    if result.empty:
+        print("No symbols matched.")
+        return
+    print(result[["period_end", "revenue", "net_income", "debt_to_equity", "fcf", "fcf_growth"]].to_string())
+
+def show_catalog(symbols=None, rebuild=False):
+    from src.storage.catalog import DataCatalog
 
-        print(f"Finished {symbol}.\n")
+    catalog = DataCatalog(os.path.join("data", "catalog.db"))
+    if rebuild:
+        catalog.rebuild("data")
+    for symbol in symbols or [None]:
+        for e in catalog.entries(symbol=symbol):
+            coverage = f"{e['start_date']} .. {e['end_date']}" if e["start_date"] else "-"
+            print(f"{e['symbol']:<8} {e['category']:<32} {coverage:<24} rows={e['row_count']} "
+                  f"v{e['schema_version']} source={e['source'] or '-'} sha256={(e['checksum'] or '')[:12]}")
+
+def export_arrow(symbols=None, export_dir=None, force=False):
+    from src.storage.arrow_store import ArrowStore
+
+    store = ArrowStore("data", export_dir=export_dir)
+    paths = store.publish_all(symbols, force=force)
+    print(f"Published {len(paths)} Arrow datasets to {store.export_dir}")
+    for path in paths:
+        print(f"  {path}")
 
 def main():
     parser = argparse.ArgumentParser(description="SenData Batch Collector")
@@ -204,11 +385,42 @@ def main():
     parser.add_argument("--source", choices=["yfinance", "alpha_vantage"], default="yfinance", help="Data source")
     parser.add_argument("--api-key", help="API Key for Alpha Vantage")
     parser.add_argument("--quarter", help="Specific quarter for earnings transcript (e.g. 2023Q3)")
-    parser.add_argument("--fetch-transcripts", action="store_true", help="Fetch recent earnings call transcripts (last 4 quarters)")
+    parser.add_argument("--fetch-transcripts", action="store_true", help="Fetch earnings call transcripts for quarters in the date range (newest first, skipping stored/known-missing)")
+    parser.add_argument("--search", help="Full-text search saved transcripts and news (filters: --symbols, --quarter, --sentiment)")
+    parser.add_argument("--raw-query", action="store_true", help="Parse --search as an FTS5 query (phrases, OR, NEAR, prefix*) instead of plain text")
+    parser.add_argument("--sentiment", help="Sentiment label filter for --search (e.g. Bullish)")
+    parser.add_argument("--catalog", action="store_true", help="List cataloged local datasets (optionally for --symbols)")
+    parser.add_argument("--rebuild-catalog", action="store_true", help="Rebuild the catalog from files already in data/")
+    parser.add_argument("--export-arrow", action="store_true", help="Publish stored prices/fundamentals as memory-mappable Arrow files (requires pyarrow)")
+    parser.add_argument("--arrow-dir", help="Arrow export directory, e.g. /dev/shm/sendata (default: $SENDATA_ARROW_DIR or data/arrow)")
+    parser.add_argument("--trace", nargs="?", const="trace.json", metavar="PATH",
+                        help="Record nested timing spans and write a Chrome trace-event JSON (default: trace.json)")
+    parser.add_argument("--trace-top", type=int, default=15, help="Number of hot spots in the --trace report")
+    parser.add_argument("--screen", help="Screen stored fundamentals, e.g. \"debt_to_equity < 0.5 and fcf_growth > 10%%\"")
     
     args = parser.parse_args()
 
-    if args.symbols:
+    if args.trace:
+        tracing.enable()
+    try:
+        run_command(parser, args)
+    finally:
+        tracer = tracing.disable()
+        if tracer is not None:
+            tracer.write_chrome_trace(args.trace)
+            print(f"\nWrote {len(tracer.events)} spans to {args.trace} (open in chrome://tracing or ui.perfetto.dev)")
+            print(tracer.report(args.trace_top))
+
+def run_command(parser, args):
+    if args.search:
+        search_saved_documents(args.search, args.symbols, args.quarter, args.sentiment, raw=args.raw_query)
+    elif args.screen:
+        screen_fundamentals(args.screen, args.symbols)
+    elif args.export_arrow:
+        export_arrow(args.symbols, args.arrow_dir)
+    elif args.catalog or args.rebuild_catalog:
+        show_catalog(args.symbols, rebuild=args.rebuild_catalog)
+    elif args.symbols:
         batch_download(args.symbols, args.start, args.end, args.source, args.api_key, args.quarter, args.fetch_transcripts)
     else:
         print("Please provide symbols using --symbols")
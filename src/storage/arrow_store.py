@@ -0,0 +1,160 @@
+import os
+import uuid
+from typing import Optional, List
+import pandas as pd
+from .corporate_actions import adjust_prices, LEGACY_PRICE_FILE
+
+DATASETS = ("price_history", "fundamentals")
+
+def _pyarrow():
+    # Optional dependency, only needed by processes that publish or attach to Arrow datasets
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.compute  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Arrow export requires pyarrow (pip install pyarrow)") from e
+    return pa
+
+class ArrowStore:
+    """
+    将本地数据集发布为未压缩的 Arrow IPC 文件，供同一主机上的多个 agent 进程以内存映射方式零拷贝读取:
+        export_dir/price_history/SYMBOL.arrow   (已复权)
+        export_dir/fundamentals.arrow      (长表: symbol, period_end, statement, field, value)
+    export_dir 默认为 base_dir/arrow (可用环境变量 SENDATA_ARROW_DIR 覆盖)，放在 /dev/shm 下即为共享内存。
+    所有进程映射同一份页缓存，只有调用 to_pandas / read_prices 时才按需物化 DataFrame。
+    文件以 "临时文件 + os.replace" 原子发布；源文件更新后，下次 open 时按 mtime 自动重新导出。
+    """
+    def __init__(self, base_dir: str = "data", export_dir: Optional[str] = None):
+        self.base_dir = base_dir
+        self.export_dir = export_dir or os.environ.get("SENDATA_ARROW_DIR") or os.path.join(base_dir, "arrow")
+
+    def path(self, dataset: str, symbol: Optional[str] = None) -> str:
+        if dataset == "fundamentals":
+            return os.path.join(self.export_dir, "fundamentals.arrow")
+        if dataset == "price_history" and symbol:
+            return os.path.join(self.export_dir, dataset, f"{symbol}.arrow")
+        raise ValueError(f"Unknown Arrow dataset {dataset!r} (symbol={symbol!r})")
+
+    def _source_path(self, dataset: str, symbol: Optional[str] = None) -> str:
+        if dataset == "fundamentals":
+            return os.path.join(self.base_dir, "fundamentals.db")
+        return os.path.join(self.base_dir, symbol, f"{dataset}.csv")
+
+    def is_fresh(self, dataset: str, symbol: Optional[str] = None) -> bool:
+        path = self.path(dataset, symbol)
+        if not os.path.exists(path):
+            return False
+        sources = [self._source_path(dataset, symbol)]
+        if dataset == "price_history":
+            sources.append(self._source_path("corporate_actions", symbol))
+        exported = os.path.getmtime(path)
+        return all(exported >= os.path.getmtime(s) for s in sources if os.path.exists(s))
+
+    def _load_source(self, dataset: str, symbol: Optional[str] = None) -> pd.DataFrame:
+        if dataset == "fundamentals":
+            from .fundamentals_store import FundamentalsStore
+            store = FundamentalsStore(self._source_path(dataset))
+            try:
+                return store.query()
+            finally:
+                store.close()
+        df = pd.read_csv(self._source_path(dataset, symbol), index_col=0)
+        # Keep exchange-local wall time; yfinance offsets differ across DST so drop them textually
+        df.index = pd.to_datetime(df.index.astype(str).str[:19])
+        df.index.name = "Date"
+        # Published prices are split/dividend adjusted, like LocalFetcher.fetch_price_history
+        actions_path = self._source_path("corporate_actions", symbol)
+        actions = pd.read_csv(actions_path, index_col=0) if os.path.exists(actions_path) else None
+        legacy_path = self._source_path(LEGACY_PRICE_FILE, symbol)
+        legacy = None
+        if os.path.exists(legacy_path):
+            legacy = pd.read_csv(legacy_path, index_col=0)
+            legacy.index = pd.to_datetime(legacy.index.astype(str).str[:19])
+        df = adjust_prices(df, actions, legacy=legacy)
+        df.index.name = "Date"
+        return df.reset_index()
+
+    def _write(self, path: str, df: pd.DataFrame):
+        pa = _pyarrow()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            # IPC file format without compression so readers can memory-map the buffers directly
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def publish(self, dataset: str, symbol: Optional[str] = None, force: bool = False) -> Optional[str]:
+        """Export one dataset; returns the Arrow file path, or None if there is no local source data."""
+        if not os.path.exists(self._source_path(dataset, symbol)):
+            return None
+        path = self.path(dataset, symbol)
+        if force or not self.is_fresh(dataset, symbol):
+            self._write(path, self._load_source(dataset, symbol))
+        return path
+
+    def publish_all(self, symbols: Optional[List[str]] = None, force: bool = False) -> List[str]:
+        """Export price history for `symbols` (default: every stored symbol) plus fundamentals."""
+        if symbols is None:
+            symbols = sorted(
+                d for d in os.listdir(self.base_dir)
+                if os.path.exists(self._source_path("price_history", d))
+            ) if os.path.isdir(self.base_dir) else []
+        paths = []
+        for symbol in symbols:
+            try:
+                path = self.publish("price_history", symbol, force=force)
+            except Exception as e:
+                print(f"Warning: Could not export price_history for {symbol}: {e}")
+                continue
+            if path:
+                paths.append(path)
+        try:
+            path = self.publish("fundamentals", force=force)
+            if path:
+                paths.append(path)
+        except Exception as e:
+            print(f"Warning: Could not export fundamentals: {e}")
+        return paths
+
+    def open(self, dataset: str, symbol: Optional[str] = None):
+        """
+        Attach to a published dataset as a memory-mapped pyarrow.Table (zero-copy).
+        Republishes first if the local source is newer; returns None if the dataset does not exist.
+        """
+        pa = _pyarrow()
+        if not self.is_fresh(dataset, symbol) and self.publish(dataset, symbol) is None:
+            return None
+        source = pa.memory_map(self.path(dataset, symbol), "r")
+        return pa.ipc.open_file(source).read_all()
+
+    def to_pandas(self, dataset: str, symbol: Optional[str] = None) -> pd.DataFrame:
+        table = self.open(dataset, symbol)
+        if table is None:
+            return pd.DataFrame()
+        df = table.to_pandas()
+        return df.set_index("Date") if dataset == "price_history" else df
+
+    def read_prices(self, symbol: str, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None) -> pd.DataFrame:
+        """Date-filtered price history; only the selected rows are converted to pandas."""
+        table = self.open("price_history", symbol)
+        if table is None:
+            return pd.DataFrame()
+        pa = _pyarrow()
+        pc = pa.compute
+        dates = table["Date"]
+        mask = None
+        for bound, op in ((start_date, pc.greater_equal), (end_date, pc.less_equal)):
+            if bound:
+                cond = op(dates, pa.scalar(pd.Timestamp(bound), type=dates.type))
+                mask = cond if mask is None else pc.and_(mask, cond)
+        if mask is not None:
+            table = table.filter(mask)
+        return table.to_pandas().set_index("Date")
@@ -0,0 +1,246 @@
+import os
+import glob
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Tuple
+
+# Bump when the on-disk layout of a category changes
+SCHEMA_VERSIONS = {
+    "balance_sheet": 2,      # long-format rows in fundamentals.db
+    "cash_flow": 2,
+    "income_statement": 2,
+    "price_history": 2,      # as-traded bars, adjusted at read time from corporate_actions.csv
+}
+DEFAULT_SCHEMA_VERSION = 1
+
+def schema_version_for(category: str) -> int:
+    return SCHEMA_VERSIONS.get(category, DEFAULT_SCHEMA_VERSION)
+
+def compute_checksum(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _business_day(date_str: str, forward: bool) -> str:
+    """Nearest weekday on or after (forward) / on or before a YYYY-MM-DD date"""
+    day = datetime.strptime(date_str[:10], "%Y-%m-%d")
+    step = timedelta(days=1 if forward else -1)
+    while day.weekday() >= 5:
+        day += step
+    return day.strftime("%Y-%m-%d")
+
+class DataCatalog:
+    """
+    本地数据目录。
+    由 FileSaver 在每次写入时维护，按 (symbol, category) 记录日期覆盖范围、行数、
+    schema 版本、大小、数据源和校验和，使得"本地数据能否满足请求"无需打开和解析文件。
+    条目同时缓存在内存中，查询为 O(1) 的字典查找；catalog.db 被其他实例或进程修改后会在下次读取时重新加载。
+    """
+    COLUMNS = ["symbol", "category", "start_date", "end_date", "row_count", "schema_version",
+               "size_bytes", "source", "checksum", "updated_at"]
+
+    def __init__(self, db_path: str = os.path.join("data", "catalog.db")):
+        self.db_path = db_path
+        self._conn = None
+        self._entries: Optional[Dict[Tuple[str, str], dict]] = None
+        # catalog.db signature when _entries was loaded; another writer changes it
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS datasets (
+                    symbol TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    start_date TEXT,
+                    end_date TEXT,
+                    row_count INTEGER,
+                    schema_version INTEGER,
+                    size_bytes INTEGER,
+                    source TEXT,
+                    checksum TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (symbol, category)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_category ON datasets (category, end_date)")
+        return self._conn
+
+    def _file_signature(self) -> Optional[tuple]:
+        """
+        (mtime, size, change counter) of catalog.db, O(1).
+        The header change counter catches commits that land within the filesystem's mtime resolution.
+        """
+        try:
+            stat = os.stat(self.db_path)
+            with open(self.db_path, 'rb') as f:
+                f.seek(24)
+                counter = f.read(4)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, counter
+
+    def _load(self) -> Dict[Tuple[str, str], dict]:
+        # Called with the lock held; reloads when another instance or process has written catalog.db
+        signature = self._file_signature()
+        if self._entries is None or signature != self._signature:
+            self._signature = signature
+            self._entries = {}
+            if os.path.exists(self.db_path):
+                rows = self._get_conn().execute(f"SELECT {', '.join(self.COLUMNS)} FROM datasets").fetchall()
+                for row in rows:
+                    entry = dict(zip(self.COLUMNS, row))
+                    self._entries[(entry["symbol"], entry["category"])] = entry
+        return self._entries
+
+    def refresh(self):
+        """Drop the in-memory view; writes from other instances are otherwise picked up on the next read"""
+        with self._lock:
+            self._entries = None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def record(self, symbol: str, category: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+               row_count: Optional[int] = None, size_bytes: Optional[int] = None, checksum: Optional[str] = None,
+               source: Optional[str] = None, schema_version: Optional[int] = None):
+        entry = {
+            "symbol": symbol,
+            "category": category,
+            "start_date": start_date,
+            "end_date": end_date,
+            "row_count": row_count,
+            "schema_version": schema_version if schema_version is not None else schema_version_for(category),
+            "size_bytes": size_bytes,
+            "source": source,
+            "checksum": checksum,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            entries = self._load()
+            # Keep the previous source if this write doesn't know it (e.g. a local re-save)
+            previous = entries.get((symbol, category))
+            if entry["source"] is None and previous:
+                entry["source"] = previous["source"]
+            conn = self._get_conn()
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO datasets ({', '.join(self.COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                    [entry[c] for c in self.COLUMNS]
+                )
+            entries[(symbol, category)] = entry
+            # Our own write is already in memory, no need to reload
+            self._signature = self._file_signature()
+
+    def remove(self, symbol: str, category: str):
+        with self._lock:
+            self._load().pop((symbol, category), None)
+            conn = self._get_conn()
+            with conn:
+                conn.execute("DELETE FROM datasets WHERE symbol = ? AND category = ?", (symbol, category))
+            self._signature = self._file_signature()
+
+    def get(self, symbol: str, category: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._load().get((symbol, category))
+        return dict(entry) if entry else None
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not self._load()
+
+    def covers(self, symbol: str, category: str, start_date: Optional[str] = None,
+               end_date: Optional[str] = None) -> bool:
+        """
+        Whether local data for (symbol, category) spans [start_date, end_date].
+        Weekend boundaries are ignored; datasets without dates only need to exist.
+        """
+        entry = self.get(symbol, category)
+        if not entry or not entry["row_count"]:
+            return False
+        if start_date and entry["start_date"] and entry["start_date"] > _business_day(start_date, forward=True):
+            return False
+        if end_date and entry["end_date"] and entry["end_date"] < _business_day(end_date, forward=False):
+            return False
+        return True
+
+    def entries(self, symbol: Optional[str] = None, category: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            values = list(self._load().values())
+        return sorted(
+            (dict(e) for e in values
+             if (symbol is None or e["symbol"] == symbol) and (category is None or e["category"] == category)),
+            key=lambda e: (e["symbol"], e["category"])
+        )
+
+    def symbols(self, category: Optional[str] = None, through: Optional[str] = None) -> List[str]:
+        """Symbols that have `category` data, optionally with coverage through a YYYY-MM-DD date"""
+        return sorted({
+            e["symbol"] for e in self.entries(category=category)
+            if through is None or (e["end_date"] or "") >= _business_day(through, forward=False)
+        })
+
+    def rebuild(self, base_dir: str = "data"):
+        """
+        Seed the catalog from data saved before it existed, or after catalog.db was lost (no source information):
+        per-symbol CSV/JSON files, statements in fundamentals.db and the month-partitioned news archives.
+        """
+        for path in glob.glob(os.path.join(base_dir, "*", "*.csv")) + glob.glob(os.path.join(base_dir, "*", "*.json")):
+            symbol = os.path.basename(os.path.dirname(path))
+            category, ext = os.path.splitext(os.path.basename(path))
+            if category in ("transcript_misses", "price_history.v1"):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                start_date = end_date = None
+                schema_version = DEFAULT_SCHEMA_VERSION
+                if ext == ".csv":
+                    header, *lines = data.decode("utf-8").splitlines() or [""]
+                    row_count = len(lines)
+                    if category in ("price_history", "corporate_actions") and lines:
+                        start_date, end_date = lines[0][:10], lines[-1][:10]
+                    if category == "price_history" and "Dividends" not in header.split(","):
+                        schema_version = schema_version_for(category)
+                else:
+                    payload = json.loads(data)
+                    row_count = len(payload) if isinstance(payload, list) else 1
+                self.record(symbol, category, start_date, end_date, row_count,
+                            size_bytes=len(data), checksum=compute_checksum(data),
+                            schema_version=schema_version)
+            except Exception as e:
+                print(f"Warning: Could not catalog {path}: {e}")
+
+        # Stores that are not one file per dataset; they supersede legacy CSVs of the same category
+        from .fundamentals_store import FundamentalsStore
+        from .news_store import NewsStore
+
+        fundamentals_path = os.path.join(base_dir, "fundamentals.db")
+        if os.path.exists(fundamentals_path):
+            store = FundamentalsStore(fundamentals_path)
+            try:
+                for entry in store.catalog_entries():
+                    self.record(**entry)
+            except Exception as e:
+                print(f"Warning: Could not catalog {fundamentals_path}: {e}")
+            finally:
+                store.close()
+
+        news_store = NewsStore(base_dir)
+        for symbol in news_store.symbols():
+            try:
+                entry = news_store.catalog_entry(symbol)
+                if entry:
+                    self.record(symbol, "news_sentiment", **entry)
+            except Exception as e:
+                print(f"Warning: Could not catalog news archive for {symbol}: {e}")
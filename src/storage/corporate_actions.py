@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple, Optional
+
+# yfinance action columns; only dividends and splits change the adjustment factors
+ACTION_COLUMNS = ["Dividends", "Stock Splits", "Capital Gains"]
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+# Schema v1 price_history.csv (pre-adjusted bars) is kept under this name after the switch to raw bars
+LEGACY_PRICE_FILE = "price_history.v1"
+
+def trading_dates(index) -> pd.DatetimeIndex:
+    """
+    Exchange-local calendar dates of daily bars (tz-naive).
+    yfinance offsets change across DST (-05:00 / -04:00), so a CSV round-trip yields strings, not timestamps;
+    converting to UTC instead would move bars of exchanges east of UTC to the previous day.
+    """
+    return pd.DatetimeIndex(pd.to_datetime(pd.Index(index).astype(str).str[:10]))
+
+def is_adjusted_layout(df: pd.DataFrame) -> bool:
+    """price_history saved before raw storage (schema v1) kept the auto-adjusted bars with action columns inline"""
+    return "Dividends" in df.columns
+
+def split_actions(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Separate a yfinance history frame into price bars and non-zero corporate action rows."""
+    columns = [c for c in ACTION_COLUMNS if c in df.columns]
+    prices = df.drop(columns=columns + (["Adj Close"] if "Adj Close" in df.columns else []))
+    if not columns:
+        return prices, pd.DataFrame(columns=ACTION_COLUMNS[:2])
+    actions = df[columns].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    actions = actions[(actions != 0).any(axis=1)].copy()
+    actions.index = trading_dates(actions.index)
+    actions.index.name = "Date"
+    return prices, actions
+
+def _event_arrays(index, close: np.ndarray, actions: pd.DataFrame):
+    """
+    Per-bar split ratio and dividend, placed on the first bar on or after each ex-date.
+    Arrays have one extra slot for actions after the last bar, which still apply to every bar.
+    """
+    n = len(close)
+    splits = np.ones(n + 1)
+    dividends = np.zeros(n + 1)
+    if actions is None or actions.empty or n == 0:
+        return splits, dividends
+    pos = trading_dates(index).searchsorted(trading_dates(actions.index))
+    if "Stock Splits" in actions.columns:
+        ratio = pd.to_numeric(actions["Stock Splits"], errors="coerce").fillna(0.0).to_numpy()
+        ok = ratio > 0
+        np.multiply.at(splits, pos[ok], ratio[ok])
+    if "Dividends" in actions.columns:
+        amount = pd.to_numeric(actions["Dividends"], errors="coerce").fillna(0.0).to_numpy()
+        np.add.at(dividends, pos, amount)
+    return splits, dividends
+
+def _after(event: np.ndarray) -> np.ndarray:
+    """prod(event[j] for j > i) for every i, as a reversed cumulative product"""
+    tail = np.cumprod(event[::-1])[::-1]
+    return np.append(tail[1:], 1.0)
+
+def adjustment_factors(raw: pd.DataFrame, actions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Backward adjustment factors for as-traded bars (CRSP / Yahoo convention):
+    every bar before an ex-date is scaled by 1/split and by (1 - dividend / previous close).
+    Returns `price` and `volume` multipliers aligned to raw.index; the latest bar is always 1.
+    """
+    close = pd.to_numeric(raw["Close"], errors="coerce").to_numpy(dtype=float)
+    splits, dividends = _event_arrays(raw.index, close, actions)
+    prev_close = np.concatenate(([np.nan], close)) / splits
+    with np.errstate(divide="ignore", invalid="ignore"):
+        div_factor = 1.0 - dividends / prev_close
+    div_factor = np.where((dividends > 0) & np.isfinite(div_factor) & (div_factor > 0), div_factor, 1.0)
+    return pd.DataFrame({
+        "price": _after(div_factor / splits)[:-1],
+        "volume": _after(splits)[:-1],
+    }, index=raw.index)
+
+def _scale(df: pd.DataFrame, price, volume) -> pd.DataFrame:
+    scaled = df.copy()
+    for column in [c for c in PRICE_COLUMNS if c in scaled.columns]:
+        scaled[column] = pd.to_numeric(scaled[column], errors="coerce") * price
+    if "Volume" in scaled.columns:
+        scaled["Volume"] = pd.to_numeric(scaled["Volume"], errors="coerce") * volume
+    return scaled
+
+def adjust_prices(raw: pd.DataFrame, actions: pd.DataFrame, legacy: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Apply split/dividend factors to stored as-traded bars at read time.
+    `legacy` (pre-adjusted v1 bars) fills the dates before the first raw bar; those bars already include
+    the actions known when they were downloaded, so they are only scaled by the factor of the first raw bar.
+    """
+    if raw.empty or "Close" not in raw.columns:
+        return raw
+    if is_adjusted_layout(raw):
+        # Legacy file, already adjusted when it was downloaded
+        return raw.drop(columns=[c for c in ACTION_COLUMNS if c in raw.columns])
+    factors = adjustment_factors(raw, actions)
+    adjusted = _scale(raw, factors["price"], factors["volume"])
+    if legacy is not None and not legacy.empty and "Close" in legacy.columns:
+        older = legacy[trading_dates(legacy.index) < trading_dates(raw.index).min()]
+        older = older.drop(columns=[c for c in ACTION_COLUMNS if c in older.columns])
+        if not older.empty:
+            older = _scale(older, factors["price"].iloc[0], factors["volume"].iloc[0])
+            adjusted = pd.concat([older, adjusted])
+    return adjusted
+
+def covers_legacy(raw: pd.DataFrame, legacy: pd.DataFrame) -> bool:
+    """True once the raw bars reach back to the first legacy bar, so the v1 file is no longer needed"""
+    if legacy.empty:
+        return True
+    return not raw.empty and trading_dates(raw.index).min() <= trading_dates(legacy.index).min()
+
+def unadjust_splits(df: pd.DataFrame, actions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Yahoo restates Close / Volume / Dividends for every later split even with auto_adjust=False.
+    Undo them so the stored bars are as traded; `actions` must list all splits up to today,
+    including those after the fetched window (e.g. yfinance Ticker.splits).
+    """
+    if df.empty or "Close" not in df.columns:
+        return df
+    no_dividends = actions.drop(columns=["Dividends"], errors="ignore") if actions is not None else None
+    factors = adjustment_factors(df, no_dividends)
+    raw = df.copy()
+    for column in [c for c in ["Open", "High", "Low", "Close", "Dividends"] if c in raw.columns]:
+        raw[column] = pd.to_numeric(raw[column], errors="coerce") / factors["price"]
+    if "Volume" in raw.columns:
+        raw["Volume"] = (pd.to_numeric(raw["Volume"], errors="coerce") / factors["volume"]).round()
+    return raw
@@ -0,0 +1,154 @@
+import os
+import sqlite3
+import threading
+import pandas as pd
+from typing import Optional, List
+
+class FundamentalsStore:
+    """
+    财务报表长表存储 (symbol, period_end, statement, field, value)。
+    取代按 symbol 保存的宽表 CSV (字段 × 日期)：写入只 upsert 新的单元格，
+    不再每次读取并重写整个文件；跨公司筛选可以一次 SQL 查询取出所需字段。
+    """
+    STATEMENTS = ("balance_sheet", "cash_flow", "income_statement")
+
+    def __init__(self, db_path: str = os.path.join("data", "fundamentals.db")):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS fundamentals (
+                    symbol TEXT NOT NULL,
+                    period_end TEXT NOT NULL,
+                    statement TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    value REAL,
+                    PRIMARY KEY (symbol, statement, field, period_end)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_fundamentals_field
+                    ON fundamentals (statement, field, period_end);
+            """)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def to_long(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Normalize a statement frame into (period_end, field, value) rows.
+        Accepts the yfinance layout (fields × dates) and the Alpha Vantage
+        layout (one row per report with a fiscalDateEnding column).
+        """
+        if df is None or df.empty:
+            return pd.DataFrame(columns=["period_end", "field", "value"])
+
+        if "fiscalDateEnding" in df.columns:
+            df = df.set_index("fiscalDateEnding").drop(columns=["reportedCurrency"], errors="ignore").T
+
+        wide = df.apply(pd.to_numeric, errors="coerce")
+        wide.columns = pd.to_datetime(wide.columns.astype(str)).strftime("%Y-%m-%d")
+        wide.index = wide.index.astype(str)
+        wide.index.name = "field"
+        wide.columns.name = "period_end"
+
+        long = wide.stack().dropna().rename("value").reset_index()
+        return long[["period_end", "field", "value"]]
+
+    def upsert(self, symbol: str, statement: str, df: pd.DataFrame) -> int:
+        """Insert or replace the cells of one statement; returns the number of values written."""
+        long = self.to_long(df)
+        if long.empty:
+            return 0
+        rows = [
+            (symbol, period_end, statement, field, float(value))
+            for period_end, field, value in long.itertuples(index=False)
+        ]
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO fundamentals (symbol, period_end, statement, field, value) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+        return len(rows)
+
+    def has_statement(self, symbol: str, statement: str) -> bool:
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT 1 FROM fundamentals WHERE symbol = ? AND statement = ? LIMIT 1",
+                (symbol, statement)
+            ).fetchone()
+        return row is not None
+
+    def query(self, fields: Optional[List[str]] = None, statements: Optional[List[str]] = None,
+              symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Long-format rows filtered by field / statement / symbol."""
+        sql = "SELECT symbol, period_end, statement, field, value FROM fundamentals WHERE 1 = 1"
+        params = []
+        for column, values in (("field", fields), ("statement", statements), ("symbol", symbols)):
+            if values:
+                sql += f" AND {column} IN ({','.join('?' * len(values))})"
+                params.extend(values)
+        with self._lock:
+            df = pd.read_sql_query(sql, self._get_conn(), params=params)
+        df["period_end"] = pd.to_datetime(df["period_end"])
+        return df
+
+    def catalog_entries(self, symbols: Optional[List[str]] = None,
+                        statements: Optional[List[str]] = None) -> List[dict]:
+        """DataCatalog coverage (dates, value count, checksum) of every stored (symbol, statement)"""
+        from .catalog import compute_checksum
+
+        df = self.query(statements=statements, symbols=symbols)
+        entries = []
+        for (symbol, statement), stored in df.groupby(["symbol", "statement"]):
+            data = stored.sort_values(["period_end", "field"]).to_csv(index=False).encode("utf-8")
+            entries.append({
+                "symbol": symbol,
+                "category": statement,
+                "start_date": stored["period_end"].min().strftime("%Y-%m-%d"),
+                "end_date": stored["period_end"].max().strftime("%Y-%m-%d"),
+                "row_count": len(stored),
+                "checksum": compute_checksum(data),
+            })
+        return entries
+
+    def get_statement(self, symbol: str, statement: str) -> pd.DataFrame:
+        """Wide view (fields × dates, newest first), same layout as the legacy CSV files."""
+        df = self.query(statements=[statement], symbols=[symbol])
+        if df.empty:
+            return pd.DataFrame()
+        wide = df.pivot(index="field", columns="period_end", values="value")
+        wide = wide.sort_index(axis=1, ascending=False)
+        wide.columns.name = None
+        wide.index.name = None
+        return wide
+
+    def import_csv(self, path: str, symbol: str, statement: str) -> int:
+        """Load a legacy wide CSV (fields × dates) into the store."""
+        return self.upsert(symbol, statement, pd.read_csv(path, index_col=0))
+
+    def import_dir(self, base_dir: str = "data") -> int:
+        """Migrate every legacy statement CSV under base_dir."""
+        total = 0
+        for symbol in sorted(os.listdir(base_dir)) if os.path.isdir(base_dir) else []:
+            for statement in self.STATEMENTS:
+                path = os.path.join(base_dir, symbol, f"{statement}.csv")
+                if os.path.exists(path):
+                    try:
+                        total += self.import_csv(path, symbol, statement)
+                    except Exception as e:
+                        print(f"Warning: Could not import {path}: {e}")
+        return total
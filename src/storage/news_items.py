@@ -0,0 +1,95 @@
+import re
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Item-level news normalization and dedup keys, shared by NewsStore and SearchIndex.
+# Kept free of pandas so `--search` starts without loading it (see tests/test_startup.py)
+
+# Stored columns follow the Alpha Vantage NEWS_SENTIMENT feed names
+NEWS_COLUMNS = ["id", "time_published", "title", "summary", "url", "source", "provider",
+                "overall_sentiment_score", "overall_sentiment_label"]
+
+def _clean(value) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).strip()
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def url_key(url: str) -> Optional[str]:
+    """Dedup key for a URL: scheme, query string, fragment and trailing slash are ignored"""
+    url = _clean(url)
+    if not url:
+        return None
+    parts = urlsplit(url.lower())
+    return _hash(f"{parts.netloc.removeprefix('www.')}{parts.path.rstrip('/')}")
+
+def content_key(title: str, time_published: Optional[str] = None) -> Optional[str]:
+    """
+    Dedup key for syndicated copies of the same headline from different sources.
+    Scoped to the publish day so recurring headlines (e.g. daily market wraps) are still stored each day.
+    """
+    title = re.sub(r"[^a-z0-9]+", " ", _clean(title).lower()).strip()
+    return _hash(f"{_clean(time_published)[:8]}|{title}") if title else None
+
+def _to_av_time(value) -> str:
+    """Normalize publish times to Alpha Vantage's UTC 'YYYYMMDDTHHMMSS'; unparseable times become ''"""
+    value = _clean(value)
+    if not value:
+        return ""
+    if re.fullmatch(r"\d{8}T\d{4,6}", value):
+        return value.ljust(15, "0")
+    try:
+        if re.fullmatch(r"\d+(\.\d+)?", value):
+            ts = datetime.fromtimestamp(float(value), tz=timezone.utc)
+        else:
+            ts = _parse_time(value)
+    except (ValueError, OverflowError, OSError):
+        return ""
+    ts = ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+    return ts.strftime("%Y%m%dT%H%M%S")
+
+def _parse_time(value: str) -> datetime:
+    try:
+        # ISO 8601, e.g. yfinance's '2024-04-15T13:30:00Z'
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    import pandas as pd
+    try:
+        return pd.Timestamp(value).to_pydatetime()
+    except (ValueError, TypeError) as e:
+        # pandas' DateParseError subclasses ValueError
+        raise ValueError(str(e)) from e
+
+def normalize_news(record: dict, provider: Optional[str] = None) -> dict:
+    """Map an Alpha Vantage or yfinance (old or nested 'content') news item onto NEWS_COLUMNS"""
+    content = record.get("content")
+    if isinstance(content, dict):
+        canonical = content.get("canonicalUrl") or {}
+        publisher = content.get("provider") or {}
+        record = {
+            **record, **content,
+            "url": canonical.get("url") if isinstance(canonical, dict) else None,
+            "source": publisher.get("displayName") if isinstance(publisher, dict) else None,
+        }
+
+    url = _clean(record.get("url") or record.get("link"))
+    title = _clean(record.get("title"))
+    published = record.get("time_published") or record.get("pubDate") or record.get("providerPublishTime")
+    item = {
+        "time_published": _to_av_time(published),
+        "title": title,
+        "summary": _clean(record.get("summary")),
+        "url": url,
+        "source": _clean(record.get("source") or record.get("publisher")),
+        "provider": provider or _clean(record.get("provider"))
+                    or ("alpha_vantage" if "overall_sentiment_score" in record else "yfinance"),
+        "overall_sentiment_score": record.get("overall_sentiment_score"),
+        "overall_sentiment_label": _clean(record.get("overall_sentiment_label")) or None,
+    }
+    item["id"] = url_key(url) or content_key(title, item["time_published"])
+    return item
@@ -0,0 +1,142 @@
+import os
+import json
+import glob
+from typing import Optional, List
+import pandas as pd
+from .news_items import NEWS_COLUMNS, normalize_news, url_key, content_key
+
+class NewsStore:
+    """
+    增量新闻存档，按月分区:
+        base_dir/SYMBOL/news/YYYY-MM.csv
+        base_dir/SYMBOL/news/_manifest.json   (最新时间戳、去重键、条数)
+    按 URL 和标题内容哈希跨数据源去重，只追加新条目；只有受影响的月份分区会被重写。
+    """
+    def __init__(self, base_dir: str = "data"):
+        self.base_dir = base_dir
+
+    def _news_dir(self, symbol: str) -> str:
+        return os.path.join(self.base_dir, symbol, "news")
+
+    def _manifest_path(self, symbol: str) -> str:
+        return os.path.join(self._news_dir(symbol), "_manifest.json")
+
+    def load_manifest(self, symbol: str) -> dict:
+        path = self._manifest_path(symbol)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Warning: Could not read news manifest {path}: {e}")
+        return {"earliest": None, "latest": None, "count": 0, "keys": []}
+
+    def _save_manifest(self, symbol: str, manifest: dict) -> bytes:
+        data = json.dumps(manifest, indent=1).encode("utf-8")
+        with open(self._manifest_path(symbol), 'wb') as f:
+            f.write(data)
+        return data
+
+    def latest_timestamp(self, symbol: str) -> Optional[str]:
+        """Newest stored publish time (UTC 'YYYYMMDDTHHMMSS'), or None if nothing is stored"""
+        return self.load_manifest(symbol)["latest"]
+
+    def time_from(self, symbol: str) -> Optional[str]:
+        """Alpha Vantage `time_from` (YYYYMMDDTHHMM) for an incremental request"""
+        latest = self.latest_timestamp(symbol)
+        return latest[:13] if latest else None
+
+    def append(self, symbol: str, df: pd.DataFrame, provider: Optional[str] = None) -> pd.DataFrame:
+        """Add unseen items; returns the normalized rows that were actually new."""
+        manifest = self.load_manifest(symbol)
+        if not os.path.exists(self._manifest_path(symbol)):
+            self._import_legacy(symbol, manifest)
+        return self._append(symbol, df, provider, manifest)
+
+    def _append(self, symbol: str, df: pd.DataFrame, provider: Optional[str], manifest: dict) -> pd.DataFrame:
+        seen = set(manifest["keys"])
+        new_rows = []
+        for record in df.to_dict("records"):
+            item = normalize_news(record, provider)
+            keys = {k for k in (url_key(item["url"]), content_key(item["title"], item["time_published"])) if k}
+            if not keys or not item["time_published"] or keys & seen:
+                continue
+            seen.update(keys)
+            new_rows.append(item)
+
+        new = pd.DataFrame(new_rows, columns=NEWS_COLUMNS)
+        if not new.empty:
+            self._write_partitions(symbol, new)
+            times = new["time_published"]
+            manifest["earliest"] = min(filter(None, [manifest["earliest"], times.min()]))
+            manifest["latest"] = max(filter(None, [manifest["latest"], times.max()]))
+            manifest["count"] += len(new)
+            manifest["keys"] = sorted(seen)
+            self._save_manifest(symbol, manifest)
+        return new
+
+    def _write_partitions(self, symbol: str, new: pd.DataFrame):
+        news_dir = self._news_dir(symbol)
+        os.makedirs(news_dir, exist_ok=True)
+        months = new["time_published"].str[:4] + "-" + new["time_published"].str[4:6]
+        for month, rows in new.groupby(months):
+            path = os.path.join(news_dir, f"{month}.csv")
+            if os.path.exists(path):
+                rows = pd.concat([pd.read_csv(path, dtype={"time_published": str}), rows], ignore_index=True)
+            rows.sort_values("time_published", ascending=False).to_csv(path, index=False)
+
+    def _import_legacy(self, symbol: str, manifest: dict):
+        # news_sentiment.csv written before the archive existed (overwritten on every run)
+        legacy = os.path.join(self.base_dir, symbol, "news_sentiment.csv")
+        if not os.path.exists(legacy) or os.path.exists(self._manifest_path(symbol)):
+            return
+        try:
+            old = pd.read_csv(legacy, index_col=0)
+        except Exception as e:
+            print(f"Warning: Could not import legacy news for {symbol}: {e}")
+            return
+        imported = self._append(symbol, old, None, manifest)
+        print(f"Imported {len(imported)} legacy news items for {symbol}")
+
+    def symbols(self) -> List[str]:
+        """Symbols with a news archive"""
+        return sorted(os.path.basename(os.path.dirname(os.path.dirname(path)))
+                      for path in glob.glob(os.path.join(self.base_dir, "*", "news", "_manifest.json")))
+
+    def catalog_entry(self, symbol: str) -> Optional[dict]:
+        """DataCatalog coverage of the archive (publish dates, item count, partition size), from the manifest"""
+        from .catalog import compute_checksum
+
+        manifest = self.load_manifest(symbol)
+        if not manifest["count"] or not manifest["latest"]:
+            return None
+        to_date = lambda t: f"{t[:4]}-{t[4:6]}-{t[6:8]}"
+        return {
+            "start_date": to_date(manifest["earliest"]),
+            "end_date": to_date(manifest["latest"]),
+            "row_count": manifest["count"],
+            "size_bytes": sum(os.path.getsize(p) for p in self.partitions(symbol)),
+            "checksum": compute_checksum("\n".join(manifest["keys"]).encode("utf-8")),
+        }
+
+    def partitions(self, symbol: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(self._news_dir(symbol), "[0-9][0-9][0-9][0-9]-[0-9][0-9].csv")))
+
+    def read(self, symbol: str, time_from: Optional[str] = None, time_to: Optional[str] = None) -> pd.DataFrame:
+        """Stored news, newest first; partitions outside [time_from, time_to] are not opened."""
+        frames = []
+        for path in self.partitions(symbol):
+            month = os.path.basename(path)[:7].replace("-", "")
+            if time_from and month < time_from[:6]:
+                continue
+            if time_to and month > time_to[:6]:
+                continue
+            frames.append(pd.read_csv(path, dtype={"time_published": str}))
+        if not frames:
+            return pd.DataFrame(columns=NEWS_COLUMNS)
+        df = pd.concat(frames, ignore_index=True)
+        if time_from:
+            df = df[df["time_published"] >= time_from]
+        if time_to:
+            df = df[df["time_published"] <= time_to]
+        return df.sort_values("time_published", ascending=False).reset_index(drop=True)
@@ -1,71 +1,233 @@
 import os
+import numpy as np
 import pandas as pd
 import json
+from typing import Optional
+from .search_index import SearchIndex
+from .fundamentals_store import FundamentalsStore
+from .catalog import DataCatalog, compute_checksum
+from .news_store import NewsStore
+from .corporate_actions import split_actions, is_adjusted_layout, covers_legacy, trading_dates, LEGACY_PRICE_FILE
+from ..utils.tracing import span, traced
 
 class FileSaver:
-    def __init__(self, base_dir="data"):
+    def __init__(self, base_dir="data", search_index: Optional[SearchIndex] = None,
+                 fundamentals_store: Optional[FundamentalsStore] = None, catalog: Optional[DataCatalog] = None):
         self.base_dir = base_dir
+        # Every write updates the catalog (coverage, rows, size, source, checksum)
+        self.catalog = catalog or DataCatalog(os.path.join(base_dir, "catalog.db"))
+        # Financial statements are stored long-format instead of per-symbol wide CSVs
+        self.fundamentals_store = fundamentals_store or FundamentalsStore(os.path.join(base_dir, "fundamentals.db"))
+        # News is appended to a deduplicated, month-partitioned archive instead of overwritten
+        self.news_store = NewsStore(base_dir)
+        # Transcripts and news are indexed for full-text search on every write
+        self.search_index = search_index or SearchIndex(os.path.join(base_dir, "search_index.db"))
 
     def _get_dir(self, symbol: str):
         path = os.path.join(self.base_dir, symbol)
         os.makedirs(path, exist_ok=True)
         return path
 
-    def save_dataframe(self, symbol: str, name: str, df: pd.DataFrame, merge: bool = True):
+    def exists(self, symbol: str, name: str, ext: str = "json") -> bool:
+        return os.path.exists(os.path.join(self.base_dir, symbol, f"{name}.{ext}"))
+
+    @traced("FileSaver.save_dataframe", cat="save")
+    def save_dataframe(self, symbol: str, name: str, df: pd.DataFrame, merge: bool = True,
+                       source: Optional[str] = None):
         if df is None or df.empty:
             print(f"Skipping save for {symbol} - {name}: Data is empty")
             return
+
+        if name in FundamentalsStore.STATEMENTS:
+            self._save_statement(symbol, name, df, source)
+            return
+
+        if name == "news_sentiment":
+            self._save_news(symbol, df, source)
+            return
         
         path = os.path.join(self._get_dir(symbol), f"{name}.csv")
+
+        actions = None
+        if name == "price_history":
+            # Bars are stored as traded; splits/dividends go to corporate_actions.csv and are applied at read time
+            df, actions = split_actions(df)
+            if isinstance(df.index, pd.DatetimeIndex):
+                # One bar per calendar date, so stored and new bars compare and dedupe across DST offsets
+                df.index = trading_dates(df.index)
+                df.index.name = "Date"
         
         # Merge logic for specific data types
         if merge and os.path.exists(path):
             try:
                 if name == "price_history":
                     # Row-based merge for Time Series (Index is Date)
-                    old_df = pd.read_csv(path, index_col=0, parse_dates=True)
-                    if isinstance(df.index, pd.DatetimeIndex):
-                        # Ensure new df index is timezone-naive or matches old_df
-                        # yfinance often returns timezone-aware. CSV read is usually naive unless parsed carefully.
-                        # Let's convert both to timezone-naive for simplicity if needed, or keep as is.
-                        # Simplest: concat and let pandas handle it, then drop duplicates.
-                        combined = pd.concat([old_df, df])
-                        # Remove duplicates based on index, keeping the new one (last)
-                        combined = combined[~combined.index.duplicated(keep='last')]
-                        combined = combined.sort_index()
+                    with span("read_csv", cat="parse", file=f"{name}.csv"):
+                        old_df = pd.read_csv(path, index_col=0, parse_dates=True)
+                    if is_adjusted_layout(old_df):
+                        # Schema v1 bars were adjusted as of each download, mixing them with raw bars corrupts history.
+                        # Keep them aside; reads fill older dates from it until raw downloads cover its range
+                        legacy_path = os.path.join(self.base_dir, symbol, f"{LEGACY_PRICE_FILE}.csv")
+                        if not os.path.exists(legacy_path):
+                            os.replace(path, legacy_path)
+                            print(f"Moved pre-adjusted {path} to {legacy_path}; it still serves dates before the raw bars")
+                    elif isinstance(df.index, pd.DatetimeIndex):
+                        # Files written before dates were normalized keep yfinance's mixed-offset timestamps
+                        old_df.index = trading_dates(old_df.index)
+                        with span("merge", cat="save", old_rows=len(old_df), new_rows=len(df)):
+                            combined = pd.concat([old_df, df])
+                            # Remove duplicates based on index, keeping the new one (last)
+                            combined = combined[~combined.index.duplicated(keep='last')]
+                            combined = combined.sort_index()
+                        combined.index.name = "Date"
                         df = combined
                         
-                elif name in ["balance_sheet", "cash_flow", "income_statement"]:
-                    # Column-based merge for Financials (Columns are Dates)
-                    old_df = pd.read_csv(path, index_col=0)
-                    
-                    # Convert new df columns to string to match CSV columns
-                    df.columns = df.columns.astype(str)
-                    
-                    # Combine: update old with new, add new columns
-                    # axis=1 concat
-                    combined = pd.concat([old_df, df], axis=1)
-                    # Remove duplicate columns (dates), keeping the new one (last)
-                    combined = combined.loc[:, ~combined.columns.duplicated(keep='last')]
-                    # Sort columns (dates) descending usually for financials
-                    try:
-                        combined = combined.sort_index(axis=1, ascending=False)
-                    except:
-                        pass
-                    df = combined
-                    
             except Exception as e:
-                print(f"Warning: Could not merge with existing {name}.csv: {e}. Overwriting.")
+                # The stored bars are the only copy of older history; never replace them with the new window
+                raise RuntimeError(f"Could not merge with existing {path}, leaving it unchanged: {e}") from e
 
-        df.to_csv(path)
+        with span("write_csv", cat="save", file=f"{name}.csv", rows=len(df)):
+            data = df.to_csv().encode("utf-8")
+            with open(path, 'wb') as f:
+                f.write(data)
         print(f"Saved {name} for {symbol} to {path}")
 
-    def save_json(self, symbol: str, name: str, data: dict):
+        start_date, end_date = self._coverage(df)
+        if name == "price_history":
+            start_date = self._retire_legacy_prices(symbol, df, start_date)
+        self._record(symbol, name, start_date, end_date, len(df), len(data), compute_checksum(data), source)
+
+        if actions is not None:
+            self._save_actions(symbol, actions, source)
+
+    def _retire_legacy_prices(self, symbol: str, raw: pd.DataFrame, start_date: Optional[str]) -> Optional[str]:
+        """Drop price_history.v1.csv once raw bars cover it; otherwise return the start date it still extends to."""
+        legacy_path = os.path.join(self.base_dir, symbol, f"{LEGACY_PRICE_FILE}.csv")
+        if not os.path.exists(legacy_path):
+            return start_date
+        try:
+            legacy = pd.read_csv(legacy_path, index_col=0)
+        except Exception as e:
+            print(f"Warning: Could not read {legacy_path}: {e}")
+            return start_date
+        if covers_legacy(raw, legacy):
+            os.remove(legacy_path)
+            print(f"Raw price history for {symbol} now covers {legacy_path}; removed it")
+            return start_date
+        legacy_start = str(legacy.index.min())[:10]
+        return min(filter(None, [start_date, legacy_start]))
+
+    def _save_actions(self, symbol: str, actions: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+        """
+        Merge splits/dividends into corporate_actions.csv; returns the rows that are new or changed.
+        The file is only rewritten when something changed, so unaffected symbols keep their factors (and caches).
+        """
+        path = os.path.join(self._get_dir(symbol), "corporate_actions.csv")
+        stored = pd.DataFrame()
+        if os.path.exists(path):
+            try:
+                stored = pd.read_csv(path, index_col=0, parse_dates=True)
+            except Exception as e:
+                print(f"Warning: Could not read {path}: {e}. Overwriting.")
+        if actions.empty:
+            return actions
+
+        known = stored.reindex(index=actions.index, columns=actions.columns).fillna(0.0)
+        changed = ~np.isclose(actions.to_numpy(dtype=float), known.to_numpy(dtype=float), rtol=1e-4).all(axis=1)
+        new = actions[changed]
+        if new.empty:
+            return new
+
+        combined = pd.concat([stored, actions])
+        combined = combined[~combined.index.duplicated(keep='last')].sort_index().fillna(0.0)
+        combined.index.name = "Date"
+        data = combined.to_csv(date_format="%Y-%m-%d").encode("utf-8")
+        with open(path, 'wb') as f:
+            f.write(data)
+        for date, row in new.iterrows():
+            events = ", ".join(f"{column}={value:g}" for column, value in row.items() if value)
+            print(f"New corporate action for {symbol} on {date:%Y-%m-%d}: {events}")
+
+        self._record(symbol, "corporate_actions", *self._coverage(combined), len(combined), len(data),
+                     compute_checksum(data), source)
+        return new
+
+    @staticmethod
+    def _coverage(df: pd.DataFrame):
+        dates = None
+        if isinstance(df.index, pd.DatetimeIndex):
+            dates = df.index
+        if dates is None or dates.isna().all():
+            return None, None
+        return dates.min().strftime("%Y-%m-%d"), dates.max().strftime("%Y-%m-%d")
+
+    @traced("DataCatalog.record", cat="save")
+    def _record(self, symbol, name, start_date, end_date, row_count, size_bytes, checksum, source):
+        try:
+            self.catalog.record(symbol, name, start_date, end_date, row_count,
+                                size_bytes=size_bytes, checksum=checksum, source=source)
+        except Exception as e:
+            print(f"Warning: Could not update catalog for {symbol} - {name}: {e}")
+
+    def _save_news(self, symbol: str, df: pd.DataFrame, source: Optional[str] = None):
+        store = self.news_store
+        with span("news_append", cat="save", rows=len(df)):
+            new = store.append(symbol, df, provider=source)
+        print(f"Saved {len(new)} new news items for {symbol} ({len(df) - len(new)} already stored)")
+        if new.empty:
+            return
+
+        try:
+            with span("search_index", cat="save", rows=len(new)):
+                self.search_index.index_news(symbol, new.to_dict("records"))
+        except Exception as e:
+            print(f"Warning: Could not update search index for {symbol} - news_sentiment: {e}")
+
+        entry = store.catalog_entry(symbol)
+        self._record(symbol, "news_sentiment", entry["start_date"], entry["end_date"], entry["row_count"],
+                     entry["size_bytes"], entry["checksum"], source)
+
+    def _save_statement(self, symbol: str, name: str, df: pd.DataFrame, source: Optional[str] = None):
+        store = self.fundamentals_store
+        legacy_path = os.path.join(self.base_dir, symbol, f"{name}.csv")
+        # One-time migration of the wide CSV so older periods are kept
+        if os.path.exists(legacy_path) and not store.has_statement(symbol, name):
+            try:
+                store.import_csv(legacy_path, symbol, name)
+            except Exception as e:
+                print(f"Warning: Could not import legacy {name}.csv for {symbol}: {e}")
+        with span("fundamentals_upsert", cat="save"):
+            count = store.upsert(symbol, name, df)
+        if not count:
+            # e.g. an Alpha Vantage statement whose values are all "None"
+            print(f"Skipping save for {symbol} - {name}: No numeric values")
+            return
+        print(f"Saved {name} for {symbol} to {store.db_path} ({count} values)")
+
+        # Catalog the whole stored statement, not just this write
+        for entry in store.catalog_entries(symbols=[symbol], statements=[name]):
+            self._record(symbol, name, entry["start_date"], entry["end_date"], entry["row_count"],
+                         None, entry["checksum"], source)
+
+    @traced("FileSaver.save_json", cat="save")
+    def save_json(self, symbol: str, name: str, data: dict, source: Optional[str] = None):
         if not data:
             print(f"Skipping save for {symbol} - {name}: Data is empty")
             return
 
         path = os.path.join(self._get_dir(symbol), f"{name}.json")
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, default=str)
+        with span("write_json", cat="save", file=f"{name}.json"):
+            content = json.dumps(data, indent=4, default=str).encode("utf-8")
+            with open(path, 'wb') as f:
+                f.write(content)
         print(f"Saved {name} for {symbol} to {path}")
+
+        self._record(symbol, name, None, None, len(data) if isinstance(data, list) else 1,
+                     len(content), compute_checksum(content), source)
+
+        if name.startswith("earnings_transcript_"):
+            try:
+                quarter = name[len("earnings_transcript_"):]
+                self.search_index.index_transcript(symbol, quarter, data.get("content", ""))
+            except Exception as e:
+                print(f"Warning: Could not update search index for {symbol} - {name}: {e}")
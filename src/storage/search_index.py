@@ -0,0 +1,192 @@
+import os
+import re
+import glob
+import json
+import sqlite3
+import threading
+from typing import Optional, List, Iterable
+from .news_items import normalize_news
+
+
+class SearchIndex:
+    """
+    基于 SQLite FTS5 的全文检索索引，覆盖财报电话会议纪要和新闻。
+    由 FileSaver 在写入时增量更新，支持按 symbol / quarter / sentiment 过滤。
+
+    documents 表保存元数据 (带普通索引，用于过滤)，
+    documents_fts 表保存 title/body 的倒排索引 (rowid 与 documents.id 一致)。
+    """
+    TRANSCRIPT = "transcript"
+    NEWS = "news"
+
+    def __init__(self, db_path: str = os.path.join("data", "search_index.db")):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        # Connect lazily so that constructing a FileSaver never touches the disk
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    doc_type TEXT NOT NULL,
+                    doc_key TEXT NOT NULL,
+                    quarter TEXT,
+                    sentiment TEXT,
+                    published TEXT,
+                    title TEXT,
+                    UNIQUE (symbol, doc_type, doc_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_documents_symbol ON documents (symbol, doc_type);
+                CREATE INDEX IF NOT EXISTS idx_documents_quarter ON documents (quarter);
+                CREATE INDEX IF NOT EXISTS idx_documents_sentiment ON documents (sentiment);
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5 (
+                    title, body, tokenize = 'porter unicode61'
+                );
+            """)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _upsert(self, conn: sqlite3.Connection, symbol: str, doc_type: str, doc_key: str, body: str,
+                title: str = "", quarter: Optional[str] = None, sentiment: Optional[str] = None,
+                published: Optional[str] = None):
+        row = conn.execute(
+            "SELECT id FROM documents WHERE symbol = ? AND doc_type = ? AND doc_key = ?",
+            (symbol, doc_type, doc_key)
+        ).fetchone()
+        if row:
+            doc_id = row[0]
+            conn.execute(
+                "UPDATE documents SET quarter = ?, sentiment = ?, published = ?, title = ? WHERE id = ?",
+                (quarter, sentiment, published, title, doc_id)
+            )
+            conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+        else:
+            cur = conn.execute(
+                "INSERT INTO documents (symbol, doc_type, doc_key, quarter, sentiment, published, title) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (symbol, doc_type, doc_key, quarter, sentiment, published, title)
+            )
+            doc_id = cur.lastrowid
+        conn.execute(
+            "INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+            (doc_id, title or "", body or "")
+        )
+
+    def index_transcript(self, symbol: str, quarter: str, content: str):
+        """索引 (或重新索引) 一份财报电话会议纪要"""
+        if not content:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                self._upsert(conn, symbol, self.TRANSCRIPT, quarter, content,
+                             title=f"{symbol} {quarter} earnings call", quarter=quarter)
+
+    def index_news(self, symbol: str, records: Iterable[dict]):
+        """
+        索引新闻条目。兼容 Alpha Vantage NEWS_SENTIMENT feed 和 yfinance news 的字段。
+        字段归一化与 NewsStore 共用 normalize_news；以 URL (缺失时用标题) 作为文档键，重复写入只会更新已有文档。
+        """
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                for record in records:
+                    item = normalize_news(record)
+                    key = item["url"] or item["title"]
+                    if not key:
+                        continue
+                    published = item["time_published"]
+                    self._upsert(conn, symbol, self.NEWS, key, item["summary"],
+                                 title=item["title"], quarter=_to_quarter(published),
+                                 sentiment=item["overall_sentiment_label"], published=published or None)
+
+    def search(self, query: str, symbols: Optional[List[str]] = None, quarter: Optional[str] = None,
+               sentiment: Optional[str] = None, doc_type: Optional[str] = None, limit: int = 20,
+               raw: bool = False) -> List[dict]:
+        """
+        全文检索，按 BM25 相关度排序返回带高亮片段的结果。
+        默认把 query 的每个词当作普通文本 (supply-chain、CEO's、debt/equity 均可直接搜索，词之间为 AND)；
+        raw=True 时 query 按 FTS5 语法解析，例如 '"supply chain"' 或 'tariff OR tariffs'。
+        quarter 既可以是 '2024Q2' 也可以是年份 '2024'。
+        """
+        sql = (
+            "SELECT d.symbol, d.doc_type, d.doc_key, d.quarter, d.sentiment, d.published, d.title, "
+            "snippet(documents_fts, 1, '[', ']', '...', 24), bm25(documents_fts) AS score "
+            "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+            "WHERE documents_fts MATCH ?"
+        )
+        params = [query if raw else quote_query(query)]
+        if symbols:
+            sql += f" AND d.symbol IN ({','.join('?' * len(symbols))})"
+            params.extend(symbols)
+        if quarter:
+            if len(quarter) == 4:
+                sql += " AND d.quarter LIKE ?"
+                params.append(f"{quarter}Q%")
+            else:
+                sql += " AND d.quarter = ?"
+                params.append(quarter)
+        if sentiment:
+            sql += " AND d.sentiment = ?"
+            params.append(sentiment)
+        if doc_type:
+            sql += " AND d.doc_type = ?"
+            params.append(doc_type)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._get_conn().execute(sql, params).fetchall()
+
+        keys = ["symbol", "doc_type", "doc_key", "quarter", "sentiment", "published", "title", "snippet", "score"]
+        return [dict(zip(keys, row)) for row in rows]
+
+    def rebuild(self, base_dir: str = "data"):
+        """从已保存的文件重建索引 (用于首次启用或索引损坏时)"""
+        for path in glob.glob(os.path.join(base_dir, "*", "earnings_transcript_*.json")):
+            symbol = os.path.basename(os.path.dirname(path))
+            quarter = os.path.basename(path)[len("earnings_transcript_"):-len(".json")]
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.index_transcript(symbol, quarter, json.load(f).get("content", ""))
+            except Exception as e:
+                print(f"Warning: Could not index {path}: {e}")
+
+        news_files = glob.glob(os.path.join(base_dir, "*", "news_sentiment.csv")) + \
+            glob.glob(os.path.join(base_dir, "*", "news", "[0-9]*.csv"))
+        for path in news_files:
+            symbol_dir = os.path.dirname(path)
+            if os.path.basename(symbol_dir) == "news":
+                symbol_dir = os.path.dirname(symbol_dir)
+            symbol = os.path.basename(symbol_dir)
+            try:
+                import pandas as pd
+                self.index_news(symbol, pd.read_csv(path).to_dict("records"))
+            except Exception as e:
+                print(f"Warning: Could not index {path}: {e}")
+
+
+def quote_query(query: str) -> str:
+    """Turn free text into an FTS5 query: each whitespace-separated token becomes a quoted string"""
+    return " ".join('"{}"'.format(token.replace('"', '""')) for token in query.split())
+
+def _to_quarter(published: str) -> Optional[str]:
+    match = re.match(r"^(\d{4})-?(\d{2})", published or "")
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    if not 1 <= month <= 12:
+        return None
+    return f"{year}Q{(month - 1) // 3 + 1}"
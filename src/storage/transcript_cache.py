@@ -0,0 +1,66 @@
+import os
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+def quarter_end(quarter: str) -> datetime:
+    """Last day of a 'YYYYQn' quarter"""
+    year, q = int(quarter[:4]), int(quarter[-1])
+    if q == 4:
+        return datetime(year, 12, 31)
+    return datetime(year, q * 3 + 1, 1) - timedelta(days=1)
+
+class TranscriptMissCache:
+    """
+    财报电话会议纪要的"负缓存"。
+    记录数据源明确返回"无纪要"的季度及其过期时间，避免每次运行重复请求。
+    刚结束的季度电话会可能还没召开，因此过期时间较短；较早的季度基本不会再出现，过期时间较长。
+    存储位置: base_dir/SYMBOL/transcript_misses.json
+    """
+    RECENT_WINDOW = timedelta(days=120)
+    RECENT_TTL = timedelta(days=3)
+    DEFAULT_TTL = timedelta(days=90)
+
+    def __init__(self, base_dir: str = "data"):
+        self.base_dir = base_dir
+        self._cache = {}
+
+    def _get_path(self, symbol: str) -> str:
+        return os.path.join(self.base_dir, symbol, "transcript_misses.json")
+
+    def _load(self, symbol: str) -> dict:
+        if symbol not in self._cache:
+            entries = {}
+            path = self._get_path(symbol)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        entries = json.load(f)
+                except Exception as e:
+                    print(f"Warning: Could not read transcript miss cache {path}: {e}")
+            self._cache[symbol] = entries
+        return self._cache[symbol]
+
+    def _save(self, symbol: str):
+        path = self._get_path(symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self._cache[symbol], f, indent=4)
+
+    def is_missing(self, symbol: str, quarter: str, now: Optional[datetime] = None) -> bool:
+        """True if the quarter was confirmed missing and the answer has not expired yet"""
+        expires = self._load(symbol).get(quarter)
+        if not expires:
+            return False
+        return datetime.fromisoformat(expires) > (now or datetime.now())
+
+    def record_miss(self, symbol: str, quarter: str, now: Optional[datetime] = None):
+        now = now or datetime.now()
+        ttl = self.RECENT_TTL if now - quarter_end(quarter) < self.RECENT_WINDOW else self.DEFAULT_TTL
+        self._load(symbol)[quarter] = (now + ttl).isoformat(timespec="seconds")
+        self._save(symbol)
+
+    def clear(self, symbol: str, quarter: str):
+        entries = self._load(symbol)
+        if entries.pop(quarter, None) is not None:
+            self._save(symbol)
@@ -2,6 +2,7 @@ import time
 import random
 import threading
 from functools import wraps
+from .tracing import span
 
 class RateLimiter:
     def __init__(self, max_calls, period):
@@ -11,7 +12,7 @@ class RateLimiter:
         self.lock = threading.Lock()
 
     def wait(self):
-        with self.lock:
+        with span("rate_limit_wait", cat="wait"), self.lock:
             now = time.time()
             # Remove timestamps older than the period
             self.timestamps = [t for t in self.timestamps if now - t < self.period]
@@ -50,7 +51,8 @@ def random_delay(min_seconds: float, max_seconds: float):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            time.sleep(random.uniform(min_seconds, max_seconds))
+            with span("random_delay", cat="sleep"):
+                time.sleep(random.uniform(min_seconds, max_seconds))
             return func(*args, **kwargs)
         return wrapper
     return decorator
@@ -0,0 +1,87 @@
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+class QuotaExhaustedError(Exception):
+    """
+    Raised when an API quota is used up.
+    `retry_after` is the number of seconds until the quota window resets.
+    """
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class DailyQuota:
+    """
+    Persistent daily call counter.
+    State is kept in a small JSON file so that separate runs on the same day
+    share the budget. The counter resets at local midnight.
+    """
+    def __init__(self, path: str, daily_limit: int):
+        self.path = path
+        self.daily_limit = daily_limit
+        self.lock = threading.Lock()
+        self._state = self._load()
+
+    def _today(self) -> str:
+        return datetime.now().strftime("%Y-%m-%d")
+
+    def _load(self) -> dict:
+        state = {"date": self._today(), "used": 0, "exhausted": False}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get("date") == state["date"]:
+                    state.update(saved)
+            except Exception as e:
+                print(f"Warning: Could not read quota state {self.path}: {e}")
+        return state
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f)
+
+    def _roll_over(self):
+        # Called with the lock held
+        if self._state["date"] != self._today():
+            self._state = {"date": self._today(), "used": 0, "exhausted": False}
+
+    @property
+    def used(self) -> int:
+        with self.lock:
+            self._roll_over()
+            return self._state["used"]
+
+    def remaining(self) -> int:
+        with self.lock:
+            self._roll_over()
+            if self._state["exhausted"]:
+                return 0
+            return max(self.daily_limit - self._state["used"], 0)
+
+    def available(self) -> bool:
+        return self.remaining() > 0
+
+    def consume(self, n: int = 1):
+        with self.lock:
+            self._roll_over()
+            self._state["used"] += n
+            self._save()
+
+    def mark_exhausted(self):
+        """The provider told us the daily quota is gone, regardless of our own count."""
+        with self.lock:
+            self._roll_over()
+            self._state["exhausted"] = True
+            self._save()
+
+    def seconds_until_reset(self) -> float:
+        now = datetime.now()
+        tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (tomorrow - now).total_seconds()
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import threading
+from functools import wraps
+from typing import Optional, List, Dict
+
+class _NullSpan:
+    """Shared no-op span returned while tracing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+# The active Tracer, or None; span() checks this once per call
+_tracer = None
+
+class Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start", "child_us")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.child_us = 0.0
+
+    def set(self, **args):
+        """Attach extra arguments (e.g. rows, source) once they are known"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        stack = self.tracer._stack()
+        stack.pop()
+        dur_us = (end - self.start) * 1e6
+        if stack:
+            stack[-1].child_us += dur_us
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self, dur_us)
+        return False
+
+class Tracer:
+    """
+    轻量级的嵌套 span 记录器 (symbol → category → fetcher 尝试 → http / parse / save)。
+    每个线程维护自己的 span 栈，用于计算自身耗时 (扣除子 span)；
+    结果可导出为 Chrome trace-event JSON (chrome://tracing / Perfetto)，或汇总为 top-N 热点报告。
+    """
+    def __init__(self):
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.events: List[dict] = []
+        self.thread_names: Dict[int, str] = {}
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            thread = threading.current_thread()
+            self.thread_names[thread.ident] = thread.name
+        return stack
+
+    def _record(self, span: Span, dur_us: float):
+        # list.append is atomic, no lock needed across threads
+        self.events.append({
+            "name": span.name,
+            "cat": span.cat,
+            "ph": "X",
+            "ts": round((span.start - self.origin) * 1e6, 1),
+            "dur": round(dur_us, 1),
+            "self": round(max(dur_us - span.child_us, 0.0), 1),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": span.args,
+        })
+
+    def span(self, name: str, cat: str = "", **args) -> Span:
+        return Span(self, name, cat, args)
+
+    def chrome_trace(self) -> dict:
+        events = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in self.thread_names.items()]
+        for event in sorted(self.events, key=lambda e: e["ts"]):
+            event = {k: v for k, v in event.items() if k != "self"}
+            event["args"] = {k: v if isinstance(v, (int, float, bool)) or v is None else str(v)
+                             for k, v in event["args"].items()}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> str:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def summary(self) -> List[dict]:
+        """Per span name: calls, total and self time (ms), sorted by self time"""
+        totals: Dict[str, dict] = {}
+        for event in self.events:
+            row = totals.setdefault(event["name"], {"name": event["name"], "cat": event["cat"], "calls": 0,
+                                                    "total_ms": 0.0, "self_ms": 0.0, "max_ms": 0.0})
+            row["calls"] += 1
+            row["total_ms"] += event["dur"] / 1000
+            row["self_ms"] += event["self"] / 1000
+            row["max_ms"] = max(row["max_ms"], event["dur"] / 1000)
+        return sorted(totals.values(), key=lambda r: r["self_ms"], reverse=True)
+
+    def report(self, top_n: int = 15) -> str:
+        rows = self.summary()
+        traced_ms = sum(r["self_ms"] for r in rows) or 1.0
+        lines = [f"Top {min(top_n, len(rows))} hot spots by self time "
+                 f"({len(self.events)} spans, {len(self.thread_names)} thread(s)):",
+                 f"{'span':<40} {'cat':<10} {'calls':>6} {'self ms':>10} {'self %':>7} {'total ms':>10} {'max ms':>9}"]
+        for r in rows[:top_n]:
+            lines.append(f"{r['name'][:40]:<40} {r['cat'][:10]:<10} {r['calls']:>6} {r['self_ms']:>10.1f} "
+                         f"{100 * r['self_ms'] / traced_ms:>6.1f}% {r['total_ms']:>10.1f} {r['max_ms']:>9.1f}")
+        return "\n".join(lines)
+
+def enable() -> Tracer:
+    """Start recording spans process-wide; returns the active tracer"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+def disable() -> Optional[Tracer]:
+    """Stop recording; returns the tracer that was active (if any) so it can still be exported"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+def span(name: str, cat: str = "", **args):
+    """Context manager for a traced block; a shared no-op when tracing is disabled"""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, cat, args)
+
+def traced(name: Optional[str] = None, cat: str = ""):
+    """Decorator version of span(); the name defaults to the function's qualified name"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with Span(tracer, span_name, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.analytics.engine import AnalyticsEngine
+
+class TestAnalyticsEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        dates = pd.bdate_range("2024-01-01", periods=60)
+        market = rng.normal(0, 0.01, len(dates))
+        self.returns = {
+            "SPY": market,
+            "AAA": 2 * market + rng.normal(0, 0.002, len(dates)),
+            "BBB": rng.normal(0, 0.01, len(dates)),
+        }
+        for symbol, r in self.returns.items():
+            close = 100 * np.cumprod(1 + r)
+            df = pd.DataFrame({"Close": close}, index=dates)
+            # BBB only has the second half of the history
+            if symbol == "BBB":
+                df = df.iloc[30:]
+            os.makedirs(os.path.join(self.tmp_dir, symbol))
+            df.to_csv(os.path.join(self.tmp_dir, symbol, "price_history.csv"))
+        self.engine = AnalyticsEngine(self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_matches_pandas_pairwise_statistics(self):
+        stats = self.engine.compute()
+        returns = self.engine.load_closes(["AAA", "BBB", "SPY"]).pct_change(fill_method=None).iloc[1:]
+
+        np.testing.assert_allclose(stats["mean"], returns.mean())
+        np.testing.assert_allclose(stats["stddev"], returns.std())
+        np.testing.assert_allclose(stats["correlation"], returns.corr(), atol=1e-12)
+        np.testing.assert_allclose(stats["covariance"], returns.cov(), atol=1e-12)
+        self.assertAlmostEqual(stats["beta"]["SPY"], 1.0)
+        self.assertAlmostEqual(stats["beta"]["AAA"], 2.0, delta=0.1)
+
+    def test_cache_invalidated_when_prices_change(self):
+        first = self.engine.compute(window=20)
+        self.assertIs(self.engine.compute(window=20), first)
+
+        path = os.path.join(self.tmp_dir, "BBB", "price_history.csv")
+        os.utime(path, (0, 0))
+        self.assertIsNot(self.engine.compute(window=20), first)
+
+    def test_symbol_analytics_shape(self):
+        result = self.engine.symbol_analytics("AAA")
+        calc = result["payload"]["RETURNS_CALCULATIONS"]
+        self.assertEqual(result["meta_data"]["source"], "local")
+        self.assertEqual(set(calc["CORRELATION"]), {"AAA", "BBB", "SPY"})
+        self.assertAlmostEqual(calc["CORRELATION"]["AAA"], 1.0)
+        self.assertEqual(self.engine.symbol_analytics("MISSING"), {})
+
+if __name__ == '__main__':
+    unittest.main()
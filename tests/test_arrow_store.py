@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+import importlib.util
+import pandas as pd
+from src.storage.saver import FileSaver
+from src.fetcher.local_fetcher import LocalFetcher
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+if HAS_PYARROW:
+    from src.storage.arrow_store import ArrowStore
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+class TestArrowStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saver = FileSaver(base_dir=self.tmp_dir)
+        self.store = ArrowStore(self.tmp_dir, export_dir=os.path.join(self.tmp_dir, "shm"))
+        dates = pd.bdate_range("2024-01-02", "2024-01-31")
+        self.prices = pd.DataFrame({"Close": range(len(dates)), "Volume": 100}, index=dates, dtype=float)
+        self.saver.save_dataframe("AAPL", "price_history", self.prices)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_publish_and_memory_mapped_open(self):
+        self.saver.save_dataframe("AAPL", "balance_sheet",
+                                  pd.DataFrame({pd.Timestamp("2023-12-31"): [1.0, 2.0]}, index=["A", "B"]))
+        paths = self.store.publish_all()
+        self.assertEqual([os.path.relpath(p, self.store.export_dir) for p in paths],
+                         [os.path.join("price_history", "AAPL.arrow"), "fundamentals.arrow"])
+
+        import pyarrow as pa
+        allocated = pa.total_allocated_bytes()
+        table = self.store.open("price_history", "AAPL")
+        self.assertEqual(table.num_rows, 22)
+        # Column buffers point into the mapped file, nothing is copied onto the heap
+        self.assertEqual(pa.total_allocated_bytes(), allocated)
+        self.assertEqual(self.store.open("fundamentals").num_rows, 2)
+
+        df = self.store.read_prices("AAPL", "2024-01-08", "2024-01-12")
+        self.assertEqual(df["Close"].tolist(), [4.0, 5.0, 6.0, 7.0, 8.0])
+        self.assertIsNone(self.store.open("price_history", "MSFT"))
+
+    def test_republishes_when_source_changes(self):
+        self.assertEqual(self.store.open("price_history", "AAPL").num_rows, 22)
+        more = pd.DataFrame({"Close": [99.0], "Volume": [1.0]}, index=pd.DatetimeIndex(["2024-02-01"]))
+        self.saver.save_dataframe("AAPL", "price_history", more)
+        # Make sure the source is strictly newer on filesystems with coarse mtimes
+        path = os.path.join(self.tmp_dir, "AAPL", "price_history.csv")
+        os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+        self.assertEqual(self.store.open("price_history", "AAPL").num_rows, 23)
+
+    def test_local_fetcher_reads_through_arrow(self):
+        fetcher = LocalFetcher(self.tmp_dir, arrow_store=self.store)
+        df = fetcher.fetch_price_history("AAPL", "2024-01-02", "2024-01-05")
+        expected = LocalFetcher(self.tmp_dir).fetch_price_history("AAPL", "2024-01-02", "2024-01-05")
+        pd.testing.assert_frame_equal(df, expected, check_names=False, check_freq=False)
+
+if __name__ == '__main__':
+    unittest.main()
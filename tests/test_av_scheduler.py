@@ -0,0 +1,163 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from src.fetcher.av_scheduler import AlphaVantageScheduler
+from src.fetcher.composite_fetcher import CompositeFetcher
+from src.storage.saver import FileSaver
+from src.utils.quota import DailyQuota, QuotaExhaustedError
+from src.main import collect_symbol, collect_analytics, SYMBOL_CATEGORIES
+
+class FakeSource:
+    """Answers fetch_<category> with `data[category]`, or an empty result"""
+    def __init__(self, name, calls, data=None):
+        self.name, self.calls, self.data = name, calls, data or {}
+
+    def __getattr__(self, method):
+        if not method.startswith("fetch_"):
+            raise AttributeError(method)
+
+        def fetch(*args, **kwargs):
+            category = method[len("fetch_"):]
+            self.calls.append((self.name, category))
+            return self.data.get(category, {} if category == "company_info" else pd.DataFrame())
+
+        return fetch
+
+class TestAlphaVantageScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.quota_path = os.path.join(self.tmp_dir, "quota.json")
+        self.state_path = os.path.join(self.tmp_dir, "deferred.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_quota_is_persistent(self):
+        quota = DailyQuota(self.quota_path, daily_limit=3)
+        quota.consume(2)
+        self.assertEqual(DailyQuota(self.quota_path, daily_limit=3).remaining(), 1)
+        quota.mark_exhausted()
+        self.assertFalse(DailyQuota(self.quota_path, daily_limit=3).available())
+
+    def test_ranks_by_priority_then_staleness(self):
+        order = []
+        scheduler = AlphaVantageScheduler(DailyQuota(self.quota_path, 10), self.state_path)
+        scheduler.submit("fresh", lambda: order.append("fresh"), last_updated=200.0)
+        scheduler.submit("stale", lambda: order.append("stale"), last_updated=100.0)
+        scheduler.submit("never", lambda: order.append("never"))
+        scheduler.submit("urgent", lambda: order.append("urgent"), priority=5, last_updated=300.0)
+        scheduler.run()
+        self.assertEqual(order, ["urgent", "never", "stale", "fresh"])
+
+    def test_defers_remaining_jobs_when_quota_exhausted(self):
+        quota = DailyQuota(self.quota_path, 10)
+        calls = []
+
+        def exhausted():
+            calls.append("a")
+            quota.mark_exhausted()
+            raise QuotaExhaustedError("daily limit", retry_after=3600)
+
+        scheduler = AlphaVantageScheduler(quota, self.state_path)
+        scheduler.submit("a", exhausted, priority=1)
+        scheduler.submit("b", lambda: calls.append("b"))
+        results = scheduler.run()
+
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(results, {})
+        self.assertEqual(set(AlphaVantageScheduler(quota, self.state_path).deferred), {"a", "b"})
+
+    def test_deferred_jobs_run_first_next_time(self):
+        order = []
+        scheduler = AlphaVantageScheduler(None, self.state_path)
+        scheduler.deferred = {"old": 0.0}
+        scheduler.submit("new", lambda: order.append("new"))
+        scheduler.submit("old", lambda: order.append("old"), last_updated=999.0)
+        scheduler.run()
+        self.assertEqual(order, ["old", "new"])
+        self.assertEqual(scheduler.deferred, {})
+
+    def test_fallback_runs_when_deferred(self):
+        calls = []
+        scheduler = AlphaVantageScheduler(DailyQuota(self.quota_path, 0), self.state_path)
+        scheduler.submit("a", lambda: calls.append("av"), fallback=lambda: calls.append("fallback"))
+        scheduler.submit("b", lambda: calls.append("av"))
+        self.assertEqual(scheduler.run(), {})
+        self.assertEqual(calls, ["fallback"])
+        self.assertEqual(set(scheduler.deferred), {"a", "b"})
+
+    def make_fetcher(self, priority, calls, yf_data):
+        fetcher = CompositeFetcher(priority=priority)
+        fetcher._instances = {
+            "yfinance": FakeSource("yf", calls, yf_data),
+            "local_analytics": FakeSource("analytics", calls),
+            "alpha_vantage": FakeSource("av", calls, {"balance_sheet": pd.DataFrame({"2023-12-31": [1.0]}, index=["totalAssets"])}),
+        }
+        return fetcher
+
+    def test_alpha_vantage_fallbacks_go_through_the_scheduler(self):
+        calls = []
+        fetcher = self.make_fetcher(["yfinance", "local_analytics", "alpha_vantage"], calls,
+                                    {"company_info": {"sector": "Tech"}})
+        saver = FileSaver(base_dir=self.tmp_dir)
+        scheduler = AlphaVantageScheduler(DailyQuota(self.quota_path, 10), self.state_path)
+        collect_symbol(fetcher, saver, scheduler, "AAPL", "2024-01-01", "2024-06-30")
+
+        # Inline pass never touches Alpha Vantage; unanswered datasets are queued for it
+        self.assertNotIn("av", [name for name, _ in calls])
+        self.assertEqual(len(scheduler.jobs), len(SYMBOL_CATEGORIES) - 1)
+        self.assertNotIn("AAPL:company_info", [job.key for job in scheduler.jobs])
+
+        # Out of quota: everything is deferred, nothing is called
+        scheduler.quota.mark_exhausted()
+        scheduler.run()
+        self.assertNotIn("av", [name for name, _ in calls])
+        self.assertIn("AAPL:balance_sheet", scheduler.deferred)
+
+        # Next quota window: the queued job runs on Alpha Vantage only
+        scheduler = AlphaVantageScheduler(DailyQuota(os.path.join(self.tmp_dir, "tomorrow.json"), 10), self.state_path)
+        collect_symbol(fetcher, saver, scheduler, "AAPL", "2024-01-01", "2024-06-30")
+        scheduler.run()
+        self.assertIn(("av", "balance_sheet"), calls)
+        self.assertEqual(saver.catalog.get("AAPL", "balance_sheet")["source"], "alpha_vantage")
+        self.assertEqual(scheduler.deferred, {})
+
+    def test_alpha_vantage_first_falls_back_when_deferred(self):
+        calls = []
+        prices = pd.DataFrame({"Close": [1.0]}, index=pd.DatetimeIndex(["2024-06-03"]))
+        fetcher = self.make_fetcher(["local_analytics", "alpha_vantage", "yfinance"], calls, {"price_history": prices})
+        saver = FileSaver(base_dir=self.tmp_dir)
+        scheduler = AlphaVantageScheduler(DailyQuota(self.quota_path, 10), self.state_path)
+        collect_symbol(fetcher, saver, scheduler, "AAPL", "2024-01-01", "2024-06-30", av_first=True)
+        self.assertEqual(calls, [])
+        self.assertEqual(len(scheduler.jobs), len(SYMBOL_CATEGORIES))
+
+        scheduler.quota.mark_exhausted()
+        scheduler.run()
+        self.assertNotIn("av", [name for name, _ in calls])
+        self.assertIn(("yf", "price_history"), calls)
+        self.assertTrue(saver.catalog.covers("AAPL", "price_history"))
+
+    def test_analytics_fallback_is_its_own_job(self):
+        calls = []
+        fetcher = self.make_fetcher(["yfinance", "local_analytics", "alpha_vantage"], calls, {})
+        fetcher._instances["local_analytics"] = FakeSource("analytics", calls, {"advanced_analytics": {}})
+        saver = FileSaver(base_dir=self.tmp_dir)
+        prices = pd.DataFrame({"Close": [1.0]}, index=pd.DatetimeIndex(["2024-06-03"]))
+        saver.save_dataframe("AAPL", "price_history", prices)
+        scheduler = AlphaVantageScheduler(DailyQuota(self.quota_path, 10), self.state_path)
+
+        # Too few local bars for analytics: AV is queued, not called inline
+        collect_analytics(fetcher, saver, scheduler, ["AAPL", "MSFT"])
+        self.assertEqual(calls, [("analytics", "advanced_analytics")])
+        self.assertEqual([job.key for job in scheduler.jobs], ["AAPL:advanced_analytics", "MSFT:advanced_analytics"])
+
+        scheduler.quota.mark_exhausted()
+        scheduler.run()
+        self.assertEqual(calls, [("analytics", "advanced_analytics")])
+        self.assertEqual(set(scheduler.deferred), {"AAPL:advanced_analytics", "MSFT:advanced_analytics"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from src.storage.catalog import DataCatalog
+from src.storage.saver import FileSaver
+from src.fetcher.composite_fetcher import CompositeFetcher
+from src.fetcher.local_fetcher import LocalFetcher
+
+class TestDataCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saver = FileSaver(base_dir=self.tmp_dir)
+        self.catalog = self.saver.catalog
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def save_prices(self, start, end):
+        dates = pd.bdate_range(start, end)
+        df = pd.DataFrame({"Close": range(len(dates))}, index=dates, dtype=float)
+        self.saver.save_dataframe("AAPL", "price_history", df, source="yfinance")
+
+    def test_records_coverage_on_write(self):
+        self.save_prices("2024-01-02", "2024-01-31")
+        self.save_prices("2024-02-01", "2024-02-09")
+        entry = self.catalog.get("AAPL", "price_history")
+        self.assertEqual((entry["start_date"], entry["end_date"]), ("2024-01-02", "2024-02-09"))
+        self.assertEqual(entry["row_count"], 29)
+        self.assertEqual(entry["source"], "yfinance")
+        self.assertEqual(entry["size_bytes"], os.path.getsize(os.path.join(self.tmp_dir, "AAPL", "price_history.csv")))
+        self.assertEqual(len(entry["checksum"]), 64)
+
+        # Persisted and visible to a new instance
+        reloaded = DataCatalog(self.catalog.db_path)
+        self.assertEqual(reloaded.get("AAPL", "price_history")["row_count"], 29)
+
+    def test_reader_sees_writes_from_another_instance(self):
+        self.save_prices("2024-01-02", "2024-01-31")
+        reader = DataCatalog(self.catalog.db_path)
+        self.assertFalse(reader.covers("MSFT", "company_info"))
+
+        self.saver.save_json("MSFT", "company_info", {"symbol": "MSFT"})
+        self.assertTrue(reader.covers("MSFT", "company_info"))
+        self.catalog.remove("MSFT", "company_info")
+        self.assertFalse(reader.covers("MSFT", "company_info"))
+        reader.close()
+
+    def test_coverage_queries(self):
+        self.save_prices("2024-01-02", "2024-02-09")  # Friday
+        # Weekend end dates are covered by Friday's bar
+        self.assertTrue(self.catalog.covers("AAPL", "price_history", "2024-01-06", "2024-02-11"))
+        self.assertFalse(self.catalog.covers("AAPL", "price_history", "2024-01-02", "2024-02-12"))
+        self.assertFalse(self.catalog.covers("AAPL", "price_history", "2023-12-01", "2024-01-31"))
+        self.assertEqual(self.catalog.symbols("price_history", through="2024-02-10"), ["AAPL"])
+        self.assertEqual(self.catalog.symbols("price_history", through="2024-02-12"), [])
+
+    def test_json_and_statements_are_cataloged(self):
+        self.saver.save_json("AAPL", "company_info", {"sector": "Tech"}, source="yfinance")
+        self.saver.save_dataframe("AAPL", "balance_sheet",
+                                  pd.DataFrame({pd.Timestamp("2023-12-31"): [1.0, 2.0]}, index=["A", "B"]))
+        self.assertTrue(self.catalog.covers("AAPL", "company_info"))
+        entry = self.catalog.get("AAPL", "balance_sheet")
+        self.assertEqual((entry["row_count"], entry["schema_version"]), (2, 2))
+
+    def test_rebuild_recovers_every_category(self):
+        dates = pd.bdate_range("2024-06-03", "2024-06-07")
+        prices = pd.DataFrame({"Close": [100.0, 100.0, 50.0, 50.0, 50.0], "Dividends": 0.0,
+                               "Stock Splits": [0, 0, 2, 0, 0]}, index=dates)
+        self.saver.save_dataframe("AAPL", "price_history", prices)
+        statement = pd.DataFrame({pd.Timestamp("2023-12-31"): [1.0, 2.0], pd.Timestamp("2022-12-31"): [3.0, 4.0]},
+                                 index=["Total Debt", "Stockholders Equity"])
+        for name in ("balance_sheet", "cash_flow", "income_statement"):
+            self.saver.save_dataframe("AAPL", name, statement)
+        self.saver.save_dataframe("AAPL", "news_sentiment", pd.DataFrame([
+            {"title": "Apple beats", "url": "https://a.com/1", "time_published": "20240415T133000"},
+            {"title": "Apple slips", "url": "https://a.com/2", "time_published": "20240502T090000"},
+        ]))
+        self.saver.save_dataframe("AAPL", "insider_transactions", pd.DataFrame({"Shares": [10]}))
+        self.saver.save_dataframe("AAPL", "recommendations", pd.DataFrame({"strongBuy": [5]}))
+        self.saver.save_json("AAPL", "company_info", {"sector": "Tech"})
+        self.saver.save_json("AAPL", "advanced_analytics", {"beta": 1.1})
+        self.saver.save_json("AAPL", "earnings_transcript_2024Q1", {"content": "Supply chain eased."})
+        self.saver.save_json("MARKET", "top_gainers_losers", {"top_gainers": []})
+
+        ignored = ("updated_at", "source")
+        strip = lambda entries: [{k: v for k, v in e.items() if k not in ignored} for e in entries]
+        saved = strip(self.catalog.entries())
+        self.assertEqual(len(saved), 12)
+
+        self.catalog.close()
+        os.remove(self.catalog.db_path)
+        rebuilt = DataCatalog(self.catalog.db_path)
+        rebuilt.rebuild(self.tmp_dir)
+        self.assertEqual(strip(rebuilt.entries()), saved)
+        rebuilt.close()
+
+    def test_composite_fetcher_skips_local_when_not_covered(self):
+        self.save_prices("2024-01-02", "2024-01-31")
+        fetcher = CompositeFetcher(priority=["local"])
+        fetcher._instances["local"] = LocalFetcher(self.tmp_dir)
+
+        df = fetcher.fetch_price_history("AAPL", "2024-01-02", "2024-01-31")
+        self.assertEqual(len(df), 22)
+        self.assertEqual(fetcher.last_source, "local")
+
+        calls = []
+        fetcher.local.fetch_price_history = lambda *args: calls.append(args) or pd.DataFrame()
+        fetcher.fetch_price_history("AAPL", "2024-01-02", "2024-03-29")
+        fetcher.fetch_company_info("MSFT")
+        self.assertEqual(calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from src.storage.saver import FileSaver
+from src.storage.corporate_actions import adjustment_factors, unadjust_splits
+from src.fetcher.local_fetcher import LocalFetcher
+
+DATES = pd.DatetimeIndex(["2024-06-03", "2024-06-04", "2024-06-05", "2024-06-06", "2024-06-07"])
+
+def raw_bars(dates=DATES, closes=(100.0, 100.0, 50.0, 49.0, 49.0), splits=(0, 0, 2, 0, 0), dividends=(0, 0, 0, 1.0, 0)):
+    return pd.DataFrame({
+        "Open": closes, "High": closes, "Low": closes, "Close": closes,
+        "Volume": [100.0] * len(dates), "Dividends": dividends, "Stock Splits": splits,
+    }, index=dates)
+
+class TestCorporateActions(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saver = FileSaver(base_dir=self.tmp_dir)
+        self.local = LocalFetcher(self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def actions_path(self):
+        return os.path.join(self.tmp_dir, "AAPL", "corporate_actions.csv")
+
+    def test_factors(self):
+        df = raw_bars()
+        actions = df[["Dividends", "Stock Splits"]]
+        factors = adjustment_factors(df, actions[(actions != 0).any(axis=1)])
+        # 2:1 split on the 5th, $1 dividend against a $50 close on the 6th
+        self.assertEqual(factors["price"].round(6).tolist(), [0.49, 0.49, 0.98, 1.0, 1.0])
+        self.assertEqual(factors["volume"].tolist(), [2.0, 2.0, 1.0, 1.0, 1.0])
+
+    def test_unadjust_yahoo_split_adjusted_bars(self):
+        yahoo = raw_bars(closes=(50.0, 50.0, 50.0, 49.0, 49.0), dividends=(0.5, 0, 0, 1.0, 0))
+        yahoo["Volume"] = [200.0, 200.0, 100.0, 100.0, 100.0]
+        raw = unadjust_splits(yahoo, yahoo[["Stock Splits"]])
+        self.assertEqual(raw["Close"].tolist(), [100.0, 100.0, 50.0, 49.0, 49.0])
+        self.assertEqual(raw["Volume"].tolist(), [100.0] * 5)
+        self.assertEqual(raw["Dividends"].tolist(), [1.0, 0, 0, 1.0, 0])
+
+    def test_raw_storage_and_read_time_adjustment(self):
+        self.saver.save_dataframe("AAPL", "price_history", raw_bars())
+        stored = pd.read_csv(os.path.join(self.tmp_dir, "AAPL", "price_history.csv"), index_col=0)
+        self.assertEqual(list(stored.columns), ["Open", "High", "Low", "Close", "Volume"])
+        self.assertEqual(len(pd.read_csv(self.actions_path())), 2)
+        self.assertEqual(self.saver.catalog.get("AAPL", "price_history")["schema_version"], 2)
+
+        adjusted = self.local.fetch_price_history("AAPL", "2024-06-01", "2024-06-30")
+        self.assertEqual(adjusted["Close"].round(6).tolist(), [49.0] * 5)
+        raw = self.local.fetch_price_history("AAPL", "2024-06-01", "2024-06-30", adjusted=False)
+        self.assertEqual(raw["Close"].tolist(), [100.0, 100.0, 50.0, 49.0, 49.0])
+        # Filtering happens after adjustment, later actions still apply
+        self.assertEqual(self.local.fetch_price_history("AAPL", "2024-06-03", "2024-06-03")["Close"].round(6).tolist(), [49.0])
+
+    def test_incremental_refresh_only_touches_new_actions(self):
+        self.saver.save_dataframe("AAPL", "price_history", raw_bars())
+        mtime = os.path.getmtime(self.actions_path())
+
+        # Overlapping window, no new actions: the actions file is left alone
+        self.saver.save_dataframe("AAPL", "price_history", raw_bars().iloc[3:])
+        self.assertEqual(os.path.getmtime(self.actions_path()), mtime)
+
+        # A new split arrives with the next bars; old bars are not re-downloaded
+        later = raw_bars(dates=pd.DatetimeIndex(["2024-06-10", "2024-06-11"]), closes=(49.0, 12.25),
+                         splits=(0, 4), dividends=(0, 0))
+        self.saver.save_dataframe("AAPL", "price_history", later)
+        self.assertEqual(len(pd.read_csv(self.actions_path())), 3)
+        adjusted = self.local.fetch_price_history("AAPL", "2024-06-01", "2024-06-30")
+        self.assertEqual(adjusted["Close"].round(6).tolist(), [12.25] * 7)
+
+    def test_tz_aware_refresh_across_dst_keeps_history(self):
+        # yfinance daily bars carry the exchange offset, which changes on 2024-03-10 (EST -> EDT)
+        def tz_bars(start, end):
+            dates = pd.bdate_range(start, end, tz="America/New_York")
+            closes = [float(i) for i in range(len(dates))]
+            return raw_bars(dates=dates, closes=closes, splits=[0] * len(dates), dividends=[0] * len(dates))
+
+        path = os.path.join(self.tmp_dir, "AAPL", "price_history.csv")
+        history = tz_bars("2024-01-02", "2024-04-30")
+        # A file written before dates were normalized, with mixed -05:00 / -04:00 offsets
+        os.makedirs(os.path.dirname(path))
+        history.drop(columns=["Dividends", "Stock Splits"]).to_csv(path)
+
+        self.saver.save_dataframe("AAPL", "price_history", tz_bars("2024-04-22", "2024-05-10"))
+        stored = pd.read_csv(path, index_col=0, parse_dates=True)
+        self.assertIsInstance(stored.index, pd.DatetimeIndex)
+        self.assertEqual(len(stored), len(pd.bdate_range("2024-01-02", "2024-05-10")))
+        self.assertEqual((stored.index.min(), stored.index.max()),
+                         (pd.Timestamp("2024-01-02"), pd.Timestamp("2024-05-10")))
+        self.assertEqual(len(self.local.fetch_price_history("AAPL", "2024-03-01", "2024-03-31")), 21)
+
+    def test_failed_merge_keeps_existing_file(self):
+        path = os.path.join(self.tmp_dir, "AAPL", "price_history.csv")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write("Date,Open,High,Low,Close,Volume\nnot-a-date,1,1,1,1,1\n")
+        with self.assertRaises(RuntimeError):
+            self.saver.save_dataframe("AAPL", "price_history", raw_bars())
+        with open(path) as f:
+            self.assertIn("not-a-date", f.read())
+
+    def test_unadjust_uses_splits_after_the_window(self):
+        # Window ends before a 2:1 split that Yahoo has already applied to these bars
+        yahoo = raw_bars(closes=(50.0, 50.0, 50.0, 50.0, 50.0), splits=(0,) * 5, dividends=(0,) * 5)
+        splits = pd.DataFrame({"Stock Splits": [2.0]}, index=pd.DatetimeIndex(["2024-07-01"]))
+        raw = unadjust_splits(yahoo, splits)
+        self.assertEqual(raw["Close"].tolist(), [100.0] * 5)
+
+        # Once that split is stored, reads adjust the raw bars back exactly once
+        self.saver.save_dataframe("AAPL", "price_history", raw.drop(columns=["Dividends", "Stock Splits"]))
+        self.saver._save_actions("AAPL", splits)
+        self.assertEqual(self.local.fetch_price_history("AAPL", "2024-06-01", "2024-06-30")["Close"].tolist(), [50.0] * 5)
+
+    def test_legacy_adjusted_file_is_kept_until_covered(self):
+        os.makedirs(os.path.join(self.tmp_dir, "AAPL"))
+        legacy = raw_bars(closes=(49.0, 49.0, 49.0, 49.0, 49.0))
+        legacy.to_csv(os.path.join(self.tmp_dir, "AAPL", "price_history.csv"))
+        self.assertEqual(self.local.fetch_price_history("AAPL", "2024-06-01", "2024-06-30")["Close"].tolist(), [49.0] * 5)
+
+        # A short window does not drop the older bars
+        self.saver.save_dataframe("AAPL", "price_history", raw_bars().iloc[3:])
+        legacy_path = os.path.join(self.tmp_dir, "AAPL", "price_history.v1.csv")
+        self.assertTrue(os.path.exists(legacy_path))
+        df = self.local.fetch_price_history("AAPL", "2024-06-01", "2024-06-30")
+        self.assertEqual(df["Close"].round(6).tolist(), [49.0] * 5)
+        self.assertEqual(self.saver.catalog.get("AAPL", "price_history")["start_date"], "2024-06-03")
+
+        # Once raw bars reach back to the first legacy bar, the v1 file is retired
+        self.saver.save_dataframe("AAPL", "price_history", raw_bars())
+        self.assertFalse(os.path.exists(legacy_path))
+        self.assertEqual(self.local.fetch_price_history("AAPL", "2024-06-01", "2024-06-30")["Close"].round(6).tolist(), [49.0] * 5)
+
+if __name__ == '__main__':
+    unittest.main()
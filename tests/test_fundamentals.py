@@ -0,0 +1,101 @@
+import io
+import os
+import contextlib
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from src.storage.fundamentals_store import FundamentalsStore
+from src.analytics.screener import Screener
+
+def yf_statement(values):
+    """yfinance layout: fields x dates"""
+    return pd.DataFrame(values, index=[pd.Timestamp("2023-12-31"), pd.Timestamp("2022-12-31")]).T
+
+class TestFundamentals(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = FundamentalsStore(os.path.join(self.tmp_dir, "fundamentals.db"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_upsert_and_wide_roundtrip(self):
+        self.store.upsert("AAPL", "balance_sheet", yf_statement({"Total Debt": [10.0, 12.0]}))
+        # A later run only brings the newest period; older periods are kept
+        self.store.upsert("AAPL", "balance_sheet", pd.DataFrame({pd.Timestamp("2024-12-31"): [8.0]}, index=["Total Debt"]))
+        wide = self.store.get_statement("AAPL", "balance_sheet")
+        self.assertEqual(list(wide.columns.strftime("%Y")), ["2024", "2023", "2022"])
+        self.assertEqual(wide.loc["Total Debt"].tolist(), [8.0, 10.0, 12.0])
+
+    def test_alpha_vantage_layout(self):
+        av = pd.DataFrame([
+            {"fiscalDateEnding": "2023-12-31", "reportedCurrency": "USD", "totalShareholderEquity": "100", "shortLongTermDebtTotal": "None"},
+        ])
+        self.assertEqual(self.store.upsert("IBM", "balance_sheet", av), 1)
+        long = self.store.query(symbols=["IBM"])
+        self.assertEqual(long["field"].tolist(), ["totalShareholderEquity"])
+
+    def test_screen_across_sources(self):
+        self.store.upsert("AAPL", "balance_sheet", yf_statement({"Total Debt": [20.0, 20.0], "Stockholders Equity": [100.0, 90.0]}))
+        self.store.upsert("AAPL", "cash_flow", yf_statement({"Free Cash Flow": [120.0, 100.0]}))
+        self.store.upsert("LEVR", "balance_sheet", yf_statement({"Total Debt": [300.0, 250.0], "Stockholders Equity": [100.0, 100.0]}))
+        self.store.upsert("LEVR", "cash_flow", yf_statement({"Free Cash Flow": [50.0, 40.0]}))
+        av_cf = pd.DataFrame([
+            {"fiscalDateEnding": "2023-12-31", "operatingCashflow": "50", "capitalExpenditures": "10"},
+            {"fiscalDateEnding": "2022-12-31", "operatingCashflow": "40", "capitalExpenditures": "10"},
+        ])
+        av_bs = pd.DataFrame([
+            {"fiscalDateEnding": "2023-12-31", "shortLongTermDebtTotal": "10", "totalShareholderEquity": "100"},
+        ])
+        self.store.upsert("IBM", "cash_flow", av_cf)
+        self.store.upsert("IBM", "balance_sheet", av_bs)
+
+        screener = Screener(self.store)
+        metrics = screener.metrics()
+        self.assertAlmostEqual(metrics.loc["IBM", "fcf_growth"], 40 / 30 - 1)
+
+        result = screener.screen("debt_to_equity < 0.5 and fcf_growth > 10%")
+        self.assertEqual(sorted(result.index), ["AAPL", "IBM"])
+
+    def test_all_none_statement_is_skipped(self):
+        from src.storage.saver import FileSaver
+        saver = FileSaver(base_dir=self.tmp_dir, fundamentals_store=self.store)
+        av = pd.DataFrame([{"fiscalDateEnding": "2023-12-31", "reportedCurrency": "USD",
+                            "totalShareholderEquity": "None", "shortLongTermDebtTotal": "None"}])
+        saver.save_dataframe("IBM", "balance_sheet", av, source="alpha_vantage")
+        self.assertFalse(self.store.has_statement("IBM", "balance_sheet"))
+        self.assertIsNone(saver.catalog.get("IBM", "balance_sheet"))
+
+    def test_metrics_use_one_period_per_statement(self):
+        # The 2024 balance sheet has no debt line; debt must not be taken from 2023
+        self.store.upsert("AAPL", "balance_sheet", pd.DataFrame({
+            pd.Timestamp("2024-12-31"): [None, 100.0],
+            pd.Timestamp("2023-12-31"): [50.0, 80.0],
+        }, index=["Total Debt", "Stockholders Equity"]))
+        metrics = Screener(self.store).metrics()
+        self.assertTrue(pd.isna(metrics.loc["AAPL", "total_debt"]))
+        self.assertTrue(pd.isna(metrics.loc["AAPL", "debt_to_equity"]))
+        self.assertEqual(metrics.loc["AAPL", "total_debt_prev"], 50.0)
+        self.assertEqual(metrics.loc["AAPL", "total_equity_prev"], 80.0)
+
+    def test_screen_unknown_column_lists_columns(self):
+        self.store.upsert("AAPL", "balance_sheet", yf_statement({"Total Debt": [20.0, 20.0], "Stockholders Equity": [100.0, 90.0]}))
+        from src import main
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        try:
+            os.makedirs("data")
+            shutil.copy(self.store.db_path, os.path.join("data", "fundamentals.db"))
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                main.screen_fundamentals("pe_ratio < 20")
+        finally:
+            os.chdir(cwd)
+        self.assertIn("pe_ratio", out.getvalue())
+        self.assertIn("Available columns:", out.getvalue())
+        self.assertIn("debt_to_equity", out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from src.storage.news_store import NewsStore
+from src.storage.saver import FileSaver
+from src.fetcher.composite_fetcher import CompositeFetcher
+
+def av_item(url, title, published):
+    return {"url": url, "title": title, "summary": "...", "time_published": published,
+            "source": "Reuters", "overall_sentiment_score": 0.3, "overall_sentiment_label": "Somewhat-Bullish"}
+
+class TestNewsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = NewsStore(self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_appends_and_partitions_by_month(self):
+        first = pd.DataFrame([
+            av_item("https://a.com/1", "Apple beats", "20240331T200000"),
+            av_item("https://a.com/2", "Apple guides higher", "20240401T090000"),
+        ])
+        self.assertEqual(len(self.store.append("AAPL", first)), 2)
+        self.assertEqual([os.path.basename(p) for p in self.store.partitions("AAPL")], ["2024-03.csv", "2024-04.csv"])
+        self.assertEqual(self.store.time_from("AAPL"), "20240401T0900")
+
+        # Overlapping run: one repeat (different query string) and one new item
+        second = pd.DataFrame([
+            av_item("https://a.com/2?utm=x", "Apple guides higher", "20240401T090000"),
+            av_item("https://a.com/3", "Apple buyback", "20240402T100000"),
+        ])
+        self.assertEqual(len(self.store.append("AAPL", second)), 1)
+
+        df = self.store.read("AAPL")
+        self.assertEqual(df["title"].tolist(), ["Apple buyback", "Apple guides higher", "Apple beats"])
+        self.assertEqual(len(self.store.read("AAPL", time_from="20240401T0000")), 2)
+
+    def test_dedup_across_sources(self):
+        self.store.append("AAPL", pd.DataFrame([av_item("https://reuters.com/x", "Apple Beats Estimates!", "20240401T090000")]))
+        yf_news = pd.DataFrame([{
+            "id": "abc",
+            "content": {
+                "title": "Apple beats estimates",
+                "summary": "...",
+                "pubDate": "2024-04-01T09:05:00Z",
+                "canonicalUrl": {"url": "https://finance.yahoo.com/news/apple"},
+                "provider": {"displayName": "Reuters"},
+            },
+        }, {
+            "uuid": "def",
+            "title": "Apple opens new store",
+            "link": "https://finance.yahoo.com/news/store",
+            "publisher": "Yahoo",
+            "providerPublishTime": 1712000000,
+        }])
+        new = self.store.append("AAPL", yf_news, provider="yfinance")
+        self.assertEqual(new["title"].tolist(), ["Apple opens new store"])
+        self.assertEqual(new["time_published"].tolist(), ["20240401T193320"])
+
+    def test_recurring_headline_is_kept_on_other_days(self):
+        self.store.append("AAPL", pd.DataFrame([av_item("", "Apple stock falls", "20240401T200000")]))
+        new = self.store.append("AAPL", pd.DataFrame([
+            av_item("", "Apple stock falls", "20240401T210000"),
+            av_item("", "Apple stock falls", "20240402T200000"),
+        ]))
+        self.assertEqual(new["time_published"].tolist(), ["20240402T200000"])
+
+    def test_bad_publish_time_skips_only_that_item(self):
+        batch = pd.DataFrame([
+            av_item("https://a.com/1", "Apple beats", "garbage"),
+            av_item("https://a.com/2", "Apple guides higher", "2024-04-01T09:00:00Z"),
+            av_item("https://a.com/3", "Apple buyback", "Tue, 02 Apr 2024 10:00:00 GMT"),
+        ])
+        new = self.store.append("AAPL", batch)
+        self.assertEqual(new["time_published"].tolist(), ["20240401T090000", "20240402T100000"])
+
+    def test_no_new_items_does_not_fall_back(self):
+        calls = []
+
+        class Source:
+            def __init__(self, name, result):
+                self.name, self.result = name, result
+
+            def fetch_news_sentiment(self, symbol, time_from=None):
+                calls.append((self.name, time_from))
+                return self.result
+
+        fetcher = CompositeFetcher(priority=["yfinance", "alpha_vantage"])
+        fetcher._instances = {"yfinance": Source("yf", pd.DataFrame()),
+                              "alpha_vantage": Source("av", pd.DataFrame([{"title": "x"}]))}
+        self.assertTrue(fetcher.fetch_news_sentiment("AAPL", time_from="20261018T0900").empty)
+        self.assertEqual(calls, [("yf", "20261018T0900")])
+        self.assertEqual(fetcher.last_source, "yfinance")
+
+        # Without time_from an empty feed still falls back
+        calls.clear()
+        self.assertEqual(len(fetcher.fetch_news_sentiment("AAPL")), 1)
+        self.assertEqual([name for name, _ in calls], ["yf", "av"])
+
+    def test_local_analytics_empty_news_is_not_an_answer(self):
+        calls = []
+
+        class Source:
+            def __init__(self, name, result):
+                self.name, self.result = name, result
+
+            def fetch_news_sentiment(self, symbol, time_from=None):
+                calls.append(self.name)
+                return self.result
+
+        # --source alpha_vantage batch order
+        fetcher = CompositeFetcher(priority=["local_analytics", "alpha_vantage", "yfinance"])
+        fetcher._instances = {"local_analytics": Source("analytics", pd.DataFrame()),
+                              "alpha_vantage": Source("av", pd.DataFrame()),
+                              "yfinance": Source("yf", pd.DataFrame([{"title": "x"}]))}
+        self.assertTrue(fetcher.fetch_news_sentiment("AAPL", time_from="20261018T0900").empty)
+        self.assertEqual(calls, ["analytics", "av"])
+        self.assertEqual(fetcher.last_source, "alpha_vantage")
+
+    def test_saver_keeps_history_and_imports_legacy_file(self):
+        os.makedirs(os.path.join(self.tmp_dir, "AAPL"))
+        pd.DataFrame([av_item("https://a.com/old", "Old story", "20231201T000000")]).to_csv(
+            os.path.join(self.tmp_dir, "AAPL", "news_sentiment.csv"))
+
+        saver = FileSaver(base_dir=self.tmp_dir)
+        saver.save_dataframe("AAPL", "news_sentiment",
+                             pd.DataFrame([av_item("https://a.com/new", "New story", "20240105T000000")]),
+                             source="alpha_vantage")
+
+        self.assertEqual(len(saver.news_store.read("AAPL")), 2)
+        entry = saver.catalog.get("AAPL", "news_sentiment")
+        self.assertEqual((entry["start_date"], entry["end_date"], entry["row_count"]), ("2023-12-01", "2024-01-05", 2))
+        # Only rows that were new in this write are indexed
+        self.assertEqual([r["title"] for r in saver.search_index.search("story")], ["New story"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import threading
+import unittest
+from src.lib.quote_service import QuoteService
+
+class TestQuoteService(unittest.TestCase):
+    def setUp(self):
+        self.polls = []
+
+        def poll(symbols):
+            self.polls.append(list(symbols))
+            return {s: {"price": 100.0, "as_of": "2024-01-02T15:59:00"} for s in symbols}
+
+        self.poll = poll
+
+    def test_many_agents_share_batched_polls(self):
+        service = QuoteService(poll_func=self.poll, interval=60.0, batch_size=100)
+        symbols = [f"S{i:03d}" for i in range(200)]
+        service.subscribe(symbols)
+
+        def agent():
+            quotes = service.get_quotes(symbols)
+            self.assertEqual(len(quotes), 200)
+
+        agents = [threading.Thread(target=agent) for _ in range(100)]
+        for t in agents:
+            t.start()
+        for t in agents:
+            t.join()
+
+        # One interval, 200 symbols, batches of 100
+        self.assertEqual(service.upstream_polls, 2)
+        self.assertEqual(service.upstream_symbols, 200)
+
+    def test_snapshot_metadata_and_staleness(self):
+        service = QuoteService(poll_func=self.poll, interval=60.0, max_staleness=30.0)
+        quote = service.get_quote("aapl")
+        self.assertEqual(quote["symbol"], "AAPL")
+        self.assertEqual(quote["price"], 100.0)
+        self.assertFalse(quote["stale"])
+
+        # Simulate an old snapshot whose refreshes keep failing
+        service._snapshot["AAPL"]["fetched_at"] -= 120
+        service.poll_func = lambda symbols: (_ for _ in ()).throw(RuntimeError("down"))
+        service._last_refresh -= 120
+        self.assertTrue(service.get_quote("AAPL")["stale"])
+
+    def test_new_symbol_polls_only_missing(self):
+        service = QuoteService(poll_func=self.poll, interval=60.0)
+        service.get_quotes(["AAPL", "MSFT"])
+        service.get_quote("NVDA")
+        self.assertEqual(self.polls, [["AAPL", "MSFT"], ["NVDA"]])
+
+    def test_unknown_symbol_follows_interval(self):
+        service = QuoteService(poll_func=lambda symbols: self.poll([s for s in symbols if s != "BADTKR"]),
+                               interval=60.0)
+        for _ in range(5):
+            quotes = service.get_quotes(["AAPL", "BADTKR"])
+        self.assertEqual((service.upstream_polls, service.upstream_symbols), (1, 2))
+        self.assertIsNone(quotes["BADTKR"]["price"])
+        self.assertEqual(quotes["AAPL"]["price"], 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
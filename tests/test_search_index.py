@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import shutil
+import tempfile
+import unittest
+from src.storage.search_index import SearchIndex
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index = SearchIndex(os.path.join(self.tmp_dir, "search_index.db"))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_transcript_search_with_filters(self):
+        self.index.index_transcript("AAPL", "2024Q2", "CEO: Supply chain constraints eased this quarter.")
+        self.index.index_transcript("MSFT", "2024Q2", "CFO: Cloud revenue grew strongly.")
+        self.index.index_transcript("AAPL", "2023Q4", "CEO: Supply chain was tight.")
+
+        results = self.index.search('"supply chain"', quarter="2024Q2", raw=True)
+        self.assertEqual([(r["symbol"], r["quarter"]) for r in results], [("AAPL", "2024Q2")])
+        self.assertIn("[Supply chain]", results[0]["snippet"])
+
+        self.assertEqual(len(self.index.search('"supply chain"', quarter="2023", raw=True)), 1)
+        self.assertEqual(self.index.search("cloud", symbols=["AAPL"]), [])
+
+    def test_plain_text_query_is_quoted(self):
+        self.index.index_transcript("AAPL", "2024Q2", "CEO's outlook: supply-chain costs fell, debt/equity is 0.4.")
+        for query in ["supply-chain", "CEO's outlook", "debt/equity", 'say "hi', "NOT", "guid*"]:
+            self.index.search(query)
+        results = self.index.search("supply-chain")
+        self.assertIn("[supply-chain]", results[0]["snippet"])
+        self.assertEqual(len(self.index.search("CEO's outlook")), 1)
+        self.assertEqual(len(self.index.search("debt/equity")), 1)
+        self.assertEqual(self.index.search("supply-chain margins"), [])
+
+        # FTS5 syntax is opt-in
+        self.assertEqual(len(self.index.search("supply OR margins", raw=True)), 1)
+        self.assertEqual(self.index.search("supply OR margins"), [])
+        with self.assertRaises(sqlite3.OperationalError):
+            self.index.search("supply-chain", raw=True)
+
+    def test_reindex_replaces_document(self):
+        self.index.index_transcript("AAPL", "2024Q2", "old text about tariffs")
+        self.index.index_transcript("AAPL", "2024Q2", "new text about margins")
+        self.assertEqual(self.index.search("tariffs"), [])
+        self.assertEqual(len(self.index.search("margins")), 1)
+
+    def test_news_sentiment_filter_and_dedup(self):
+        item = {
+            "title": "Apple beats estimates",
+            "summary": "Strong iPhone demand despite supply chain issues.",
+            "url": "https://example.com/a",
+            "time_published": "20240415T133000",
+            "overall_sentiment_label": "Bullish",
+        }
+        self.index.index_news("AAPL", [item, dict(item)])
+        results = self.index.search("iphone", sentiment="Bullish")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["quarter"], "2024Q2")
+        self.assertEqual(self.index.search("iphone", sentiment="Bearish"), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "numpy", "yfinance", "requests", "dotenv"]
+
+def run_python(code, cwd=ROOT):
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True, env=env
+    )
+    return result.stdout.strip()
+
+class TestStartup(unittest.TestCase):
+    """Guards against heavy imports creeping back into CLI startup."""
+    # Generous budget for `--help`; a regression to eager pandas/yfinance imports costs well over this
+    HELP_BUDGET_SECONDS = 0.5
+
+    def test_import_main_is_lightweight(self):
+        loaded = run_python(
+            "import sys, src.main; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        self.assertEqual(loaded, "")
+
+    def test_composite_fetcher_builds_fetchers_lazily(self):
+        loaded = run_python(
+            "import sys; from src.fetcher.composite_fetcher import CompositeFetcher; "
+            "CompositeFetcher(priority=['local', 'yfinance', 'alpha_vantage']); "
+            "CompositeFetcher(priority=['local']).fetch_company_info('NOPE'); "
+            "print(','.join(m for m in ['yfinance', 'requests'] if m in sys.modules))"
+        )
+        self.assertEqual(loaded, "")
+
+    def test_search_does_not_load_pandas(self):
+        # Runs in an empty directory so the search index is created there, not in the repo's data/
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            loaded = run_python(
+                "import sys; from src import main; "
+                "sys.argv = ['main', '--search', 'supply-chain']; main.main(); "
+                f"print('loaded:', ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+                cwd=tmp_dir
+            )
+        finally:
+            shutil.rmtree(tmp_dir)
+        self.assertEqual(loaded.splitlines()[-1], "loaded:")
+
+    def test_help_startup_time(self):
+        # Best of three to smooth out a cold disk cache
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "src.main", "--help"], cwd=ROOT,
+                           capture_output=True, check=True)
+            timings.append(time.perf_counter() - start)
+        self.assertLess(min(timings), self.HELP_BUDGET_SECONDS,
+                        f"`python -m src.main --help` took {min(timings):.3f}s")
+
+if __name__ == '__main__':
+    unittest.main()
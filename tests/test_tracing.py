@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import pandas as pd
+from src.utils import tracing
+from src.utils.tracing import span, traced
+from src.storage.saver import FileSaver
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        tracing.disable()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_disabled_is_a_shared_noop(self):
+        self.assertIs(span("a"), span("b", cat="x", symbol="AAPL"))
+        start = time.perf_counter()
+        for _ in range(100000):
+            with span("hot", cat="loop"):
+                pass
+        # Well under a microsecond per span on any machine running the suite
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_nested_spans_self_time_and_threads(self):
+        tracer = tracing.enable()
+
+        @traced("leaf", cat="work")
+        def leaf():
+            time.sleep(0.02)
+
+        def worker():
+            with span("AAPL", cat="symbol"):
+                with span("price_history", cat="category", symbol="AAPL"):
+                    leaf()
+
+        thread = threading.Thread(target=worker, name="worker-1")
+        thread.start()
+        thread.join()
+        with span("main", cat="symbol"):
+            pass
+        tracing.disable()
+
+        summary = {r["name"]: r for r in tracer.summary()}
+        self.assertEqual(set(summary), {"AAPL", "price_history", "main", "leaf"})
+        category = summary["price_history"]
+        self.assertGreaterEqual(category["total_ms"], 20)
+        self.assertLess(category["self_ms"], 10)
+
+        trace = tracer.chrome_trace()
+        json.dumps(trace)
+        names = {e["args"]["name"] for e in trace["traceEvents"] if e["ph"] == "M"}
+        self.assertIn("worker-1", names)
+        spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(len({e["tid"] for e in spans}), 2)
+        self.assertIn("leaf", tracer.report(top_n=1).splitlines()[2])
+
+    def test_saver_writes_are_traced(self):
+        tracer = tracing.enable()
+        saver = FileSaver(base_dir=self.tmp_dir)
+        df = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.DatetimeIndex(["2024-01-02", "2024-01-03"]))
+        saver.save_dataframe("AAPL", "price_history", df)
+        saver.save_dataframe("AAPL", "price_history", df)
+        path = tracer.write_chrome_trace(os.path.join(self.tmp_dir, "trace.json"))
+
+        with open(path) as f:
+            names = {e["name"] for e in json.load(f)["traceEvents"]}
+        self.assertTrue({"FileSaver.save_dataframe", "read_csv", "merge", "write_csv", "DataCatalog.record"} <= names)
+
+if __name__ == '__main__':
+    unittest.main()
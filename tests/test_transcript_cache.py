@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from src.main import make_transcript_job
+from src.storage.saver import FileSaver
+from src.storage.transcript_cache import TranscriptMissCache, quarter_end
+
+class FakeFetcher:
+    def __init__(self, available, answering="alpha_vantage"):
+        self.available = available
+        self.answering = answering
+        self.calls = []
+        self.last_source = None
+        self.empty_sources = []
+
+    def fetch_earnings_call_transcript(self, symbol, quarter):
+        self.calls.append(quarter)
+        found = quarter in self.available
+        self.last_source = self.answering if found else None
+        self.empty_sources = [] if found else [self.answering]
+        return "transcript" if found else ""
+
+class TestTranscriptCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saver = FileSaver(base_dir=self.tmp_dir)
+        self.cache = TranscriptMissCache(base_dir=self.tmp_dir)
+
+    def tearDown(self):
+        self.saver.search_index.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_quarter_end(self):
+        self.assertEqual(quarter_end("2024Q1"), datetime(2024, 3, 31))
+        self.assertEqual(quarter_end("2024Q4"), datetime(2024, 12, 31))
+
+    def test_miss_expiry(self):
+        self.cache.record_miss("AAPL", "2020Q1", now=datetime(2024, 1, 1))
+        self.assertTrue(self.cache.is_missing("AAPL", "2020Q1", now=datetime(2024, 2, 1)))
+        self.assertFalse(self.cache.is_missing("AAPL", "2020Q1", now=datetime(2024, 6, 1)))
+        # Reload from disk
+        reloaded = TranscriptMissCache(base_dir=self.tmp_dir)
+        self.assertTrue(reloaded.is_missing("AAPL", "2020Q1", now=datetime(2024, 2, 1)))
+
+    def test_skips_stored_and_cached_quarters_with_early_stop(self):
+        quarters = ["2020Q1", "2020Q2", "2020Q3", "2020Q4", "2021Q1"]
+        fetcher = FakeFetcher(available={"2021Q1"})
+        make_transcript_job(fetcher, self.saver, "AAPL", quarters, self.cache)()
+        # Newest first, stop after two consecutive misses
+        self.assertEqual(fetcher.calls, ["2021Q1", "2020Q4", "2020Q3"])
+
+        fetcher.calls = []
+        make_transcript_job(fetcher, self.saver, "AAPL", quarters, self.cache)()
+        self.assertEqual(fetcher.calls, [])
+
+    def test_miss_not_cached_without_alpha_vantage_answer(self):
+        fetcher = FakeFetcher(available=set(), answering="yfinance")
+        make_transcript_job(fetcher, self.saver, "AAPL", ["2020Q1", "2020Q2"], self.cache)()
+        self.assertFalse(self.cache.is_missing("AAPL", "2020Q1"))
+        self.assertFalse(self.cache.is_missing("AAPL", "2020Q2"))
+
+    def test_force_ignores_miss_cache(self):
+        fetcher = FakeFetcher(available=set())
+        self.cache.record_miss("AAPL", "2020Q1")
+        make_transcript_job(fetcher, self.saver, "AAPL", ["2020Q1"], self.cache, force=True)()
+        self.assertEqual(fetcher.calls, ["2020Q1"])
+
+if __name__ == '__main__':
+    unittest.main()